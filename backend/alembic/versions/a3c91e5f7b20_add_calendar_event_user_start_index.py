@@ -0,0 +1,32 @@
+"""Add calendar event user/start_time index
+
+Revision ID: a3c91e5f7b20
+Revises: 45b76fed7e0f
+Create Date: 2026-10-16 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e5f7b20'
+down_revision: Union[str, None] = '45b76fed7e0f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_calendar_event_user_start',
+        'calendar_events',
+        ['user_id', 'start_time'],
+        unique=False,
+        postgresql_include=['end_time', 'title', 'event_type', 'priority', 'contributes_to_goal']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calendar_event_user_start', table_name='calendar_events')
@@ -0,0 +1,31 @@
+"""Add calendar event user/eisenhower_quadrant index
+
+Revision ID: c7d24e81a9f3
+Revises: a3c91e5f7b20
+Create Date: 2026-10-16 14:37:08.562190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d24e81a9f3'
+down_revision: Union[str, None] = 'a3c91e5f7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_calendar_event_user_quadrant',
+        'calendar_events',
+        ['user_id', 'eisenhower_quadrant'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_calendar_event_user_quadrant', table_name='calendar_events')
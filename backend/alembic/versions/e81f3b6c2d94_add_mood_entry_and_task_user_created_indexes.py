@@ -0,0 +1,38 @@
+"""Add mood entry and task user/created_at indexes
+
+Revision ID: e81f3b6c2d94
+Revises: c7d24e81a9f3
+Create Date: 2026-10-16 16:02:41.318275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81f3b6c2d94'
+down_revision: Union[str, None] = 'c7d24e81a9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_mood_entry_user_created',
+        'mood_entries',
+        ['user_id', 'created_at'],
+        unique=False
+    )
+    op.create_index(
+        'idx_user_created',
+        'tasks',
+        ['user_id', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_user_created', table_name='tasks')
+    op.drop_index('ix_mood_entry_user_created', table_name='mood_entries')
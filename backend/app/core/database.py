@@ -1,6 +1,7 @@
+from contextlib import contextmanager
 from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 import logging
 from .config import settings
@@ -77,6 +78,17 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def no_expire_on_commit(session: Session):
+    """Keep loaded ORM attributes readable across commits inside the block"""
+    previous = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield session
+    finally:
+        session.expire_on_commit = previous
+
+
 def create_database():
     """Create database tables"""
     try:
@@ -0,0 +1,39 @@
+"""
+Shared Redis connection for caches that every worker process must see
+"""
+
+import logging
+from typing import Optional
+
+import redis
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cache lookups sit on request paths, so a slow Redis degrades to a miss quickly
+REDIS_CACHE_TIMEOUT = 0.5
+
+_UNSET = object()
+_redis_client = _UNSET
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """
+    Return the process's Redis client, or None when Redis was unreachable on first use
+    """
+    global _redis_client
+    if _redis_client is _UNSET:
+        try:
+            client = redis.from_url(
+                settings.redis_url,
+                socket_timeout=REDIS_CACHE_TIMEOUT,
+                socket_connect_timeout=REDIS_CACHE_TIMEOUT
+            )
+            client.ping()
+            _redis_client = client
+            logger.info("Connected to Redis for shared caches")
+        except Exception as e:
+            logger.warning(f"Redis not available for shared caches, using in-process caches: {e}")
+            _redis_client = None
+    return _redis_client
@@ -1,17 +1,23 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from passlib.hash import bcrypt
 from cryptography.fernet import Fernet
 import re
+import time
 import logging
 from app.core.config import settings
 
-# Enhanced password context with better security
+# Enhanced password context with better security. New hashes use argon2id;
+# bcrypt stays verifiable for existing accounts and is upgraded on login
 pwd_context = CryptContext(
-    schemes=["bcrypt"],
+    schemes=["argon2", "bcrypt"],
     deprecated="auto",
+    argon2__type="ID",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,  # KiB (19 MiB), OWASP's argon2id baseline
+    argon2__parallelism=1,
     bcrypt__rounds=12,  # Increased rounds for better security
 )
 
@@ -31,6 +37,12 @@ cipher_suite = get_cipher_suite()
 
 logger = logging.getLogger(__name__)
 
+# Seconds a verified access token's payload is reused without re-checking its
+# signature, and how many tokens are remembered (oldest verification evicted first)
+ACCESS_TOKEN_CACHE_TTL = 60
+ACCESS_TOKEN_CACHE_MAX_ENTRIES = 10000
+_access_token_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
 # Password validation regex
 PASSWORD_REGEX = re.compile(
     r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$'
@@ -42,8 +54,17 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password against its hash
+    Returns (is_valid, new_hash); new_hash is set when the stored hash uses a
+    deprecated scheme or parameters and should be replaced
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
-    """Hash a password with bcrypt"""
+    """Hash a password with argon2id"""
     return pwd_context.hash(password)
 
 
@@ -116,12 +137,23 @@ def create_refresh_token(data: dict) -> str:
 
 def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
     """Decode and validate an access token"""
+    # Reuse a recent verification of the same token, but never past its exp
+    now = time.monotonic()
+    cached = _access_token_cache.get(token)
+    if cached and now - cached[0] < ACCESS_TOKEN_CACHE_TTL and cached[1]["exp"] > time.time():
+        return dict(cached[1])
+    
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         
         # Verify token type
         if payload.get("type") != "access":
             return None
+        
+        _access_token_cache[token] = (now, dict(payload))
+        _access_token_cache.move_to_end(token)
+        if len(_access_token_cache) > ACCESS_TOKEN_CACHE_MAX_ENTRIES:
+            _access_token_cache.popitem(last=False)
             
         return payload
     except JWTError as e:
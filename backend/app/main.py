@@ -1,12 +1,14 @@
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from pydantic import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
 import logging
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 import uuid
 from app.core.config import settings
 from app.core.database import engine, Base
@@ -22,11 +24,19 @@ from app.routers import mood as mood_router
 # Import all models to register them with SQLAlchemy
 from app.models import user, chat, goal, mood, calendar as calendar_models, task
 
-# Configure logging
+# Configure logging - request handlers only enqueue records; a listener thread
+# does the formatting and the blocking stream writes
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+log_listener = QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
 logging.basicConfig(
     level=getattr(logging, settings.log_level.upper()),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[QueueHandler(_log_queue)]
 )
+log_listener.start()
 logger = logging.getLogger(__name__)
 
 # Database migrations are handled by Alembic
@@ -91,6 +101,7 @@ app = FastAPI(
     version=settings.version,
     description="AI Companion App for personal growth and productivity",
     debug=settings.debug and settings.is_development,
+    default_response_class=ORJSONResponse,
 )
 
 # Security middleware (order matters)
@@ -148,6 +159,8 @@ app.include_router(coaching.router, prefix="/api/coaching", tags=["goal-coaching
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(autonomous.router, prefix="/api/autonomous", tags=["autonomous-scheduling"])
 app.include_router(ai_calendar.router, prefix="/api/ai-calendar", tags=["ai-calendar"])
+if settings.debug and settings.is_development:
+    app.include_router(ai_calendar.debug_router, prefix="/api/ai-calendar", tags=["ai-calendar-debug"])
 
 
 @app.get("/")
@@ -238,7 +251,9 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("🛑 Aurora Life OS shutting down...")
+    await ai_calendar.close_openai_client()
     logger.info("✅ Cleanup completed")
+    log_listener.stop()
 
 
 @app.get("/api/scheduler/status")
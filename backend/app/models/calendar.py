@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Enum, JSON, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -110,4 +110,16 @@ class CalendarEvent(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     user = relationship("User")
-    goal = relationship("Goal")
\ No newline at end of file
+    goal = relationship("Goal")
+    
+    # Indexes for performance
+    __table_args__ = (
+        # Per-user time-range scans; on PostgreSQL the included columns let the
+        # assistant's range queries be answered from the index
+        Index(
+            'ix_calendar_event_user_start', 'user_id', 'start_time',
+            postgresql_include=['end_time', 'title', 'event_type', 'priority', 'contributes_to_goal']
+        ),
+        # Per-user lookups by Eisenhower quadrant for the priority views
+        Index('ix_calendar_event_user_quadrant', 'user_id', 'eisenhower_quadrant'),
+    )
\ No newline at end of file
@@ -89,6 +89,7 @@ class Task(Base):
     # Indexes for performance
     __table_args__ = (
         Index('idx_user_status', 'user_id', 'status'),
+        Index('idx_user_created', 'user_id', 'created_at'),
         Index('idx_goal_order', 'goal_id', 'order_index'),
         Index('idx_due_date', 'due_date'),
     )
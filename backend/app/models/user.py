@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from ..core.database import Base
 
 
@@ -38,4 +38,9 @@ class User(Base):
     
     # Relationships
     goals = relationship("Goal", back_populates="user", cascade="all, delete-orphan")
-    tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan")
\ No newline at end of file
+    tasks = relationship("Task", back_populates="user", cascade="all, delete-orphan")
+    
+    @validates('username', 'email')
+    def _normalize_login_identifier(self, key, value):
+        """Store usernames and emails lowercased so login's exact-match lookups hit their unique indexes"""
+        return value.lower().strip() if value else value
\ No newline at end of file
@@ -1,17 +1,160 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+import asyncio
+import logging
+import os
+import re
+import traceback
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from functools import lru_cache
+
+import httpx
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from openai import AsyncOpenAI
+from sqlalchemy import Integer, cast, delete, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, NamedTuple, Optional, Dict, Any
 from datetime import datetime, date, timedelta, time
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db, no_expire_on_commit
 from app.models import User
-from app.models.calendar import EventType, EventPriority, SchedulingType
+from app.models.calendar import CalendarEvent, EventType, EventPriority, SchedulingType, EisenhowerQuadrant
+from app.models.goal import Goal, GoalStatus
 from app.services.ai_calendar_service import AICalendarService
+from app.services.google_calendar_service import GoogleCalendarService
+from app.services.intent_cache import IntentCache
+from app.services.intent_matcher import match_intent
 from app.routers.auth import get_current_user
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(default_response_class=ORJSONResponse)
+# Test-user endpoints, only mounted by main.py in development with DEBUG on
+debug_router = APIRouter(default_response_class=ORJSONResponse)
 ai_calendar_service = AICalendarService()
+google_calendar_service = GoogleCalendarService()
+intent_cache = IntentCache()
+
+# Enum members used inside the bulk scheduling loops
+_EVT_GOAL_WORK = EventType.GOAL_WORK
+_PRI_HIGH = EventPriority.HIGH
+
+# Task breakdown labels from the LLM mapped onto calendar enums
+_EVENT_TYPE_MAP = {
+    'task': EventType.TASK,
+    'meeting': EventType.MEETING,
+    'focus': EventType.DEEP_WORK,
+    'research': EventType.LEARNING,
+    'creative': EventType.TASK,
+    'outreach': EventType.NETWORKING,
+    'planning': EventType.PLANNING
+}
+_PRIORITY_MAP = {
+    'low': EventPriority.LOW,
+    'medium': EventPriority.MEDIUM,
+    'high': EventPriority.HIGH,
+    'urgent': EventPriority.URGENT
+}
+
+# Shared async OpenAI client, rebuilt only when the configured key changes
+_openai_client: Optional[AsyncOpenAI] = None
+_openai_client_key: Optional[str] = None
+
+# Connection pool shared by every assistant request, sized for concurrent traffic
+_openai_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=httpx.Timeout(60.0, connect=5.0)
+)
+
+
+def _get_openai_client() -> Optional[AsyncOpenAI]:
+    """
+    Return the shared AsyncOpenAI client, or None if no API key is configured
+    """
+    global _openai_client, _openai_client_key
+    
+    # Get API key same way as in OpenAI service
+    api_key = os.getenv("OPENAI_API_KEY") or settings.openai_api_key
+    if not api_key:
+        return None
+    if _openai_client is None or api_key != _openai_client_key:
+        _openai_client = AsyncOpenAI(api_key=api_key, http_client=_openai_http_client)
+        _openai_client_key = api_key
+    return _openai_client
+
+
+async def close_openai_client():
+    """
+    Close the shared OpenAI connection pool on application shutdown
+    """
+    await _openai_http_client.aclose()
+
+
+# Routine times in the free-text user context, e.g. "Work: 9:00 - 17:00" or "Gym at: 18:30"
+_WORK_HOURS_RE = re.compile(r'[Ww]ork[^:]*:\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})')
+_WAKE_RE = re.compile(r'[Ww]ake[^:]*:\s*(\d{1,2}:\d{2})')
+_GYM_RE = re.compile(r'[Gg]ym[^:]*:\s*(\d{1,2}:\d{2})')
+_LUNCH_RE = re.compile(r'[Ll]unch[^:]*:\s*(\d{1,2}:\d{2})')
+_DINNER_RE = re.compile(r'[Dd]inner[^:]*:\s*(\d{1,2}:\d{2})')
+_SLEEP_RE = re.compile(r'[Ss]leep[^:]*:\s*(\d{1,2}:\d{2})')
+
+
+def _parse_hhmm(value: str) -> time:
+    """
+    Parse an 'H:MM' / 'HH:MM' routine time without going through strptime
+    """
+    hours, _, minutes = value.partition(':')
+    return time(int(hours), int(minutes))
+
+
+class RoutineTimes(NamedTuple):
+    """
+    Clock times parsed from a user's routine description
+    """
+    wake: Optional[time]
+    work_start: Optional[time]
+    work_end: Optional[time]
+    gym: Optional[time]
+    lunch: Optional[time]
+    dinner: Optional[time]
+    sleep: Optional[time]
+
+
+@lru_cache(maxsize=128)
+def _parse_routine_times(user_context: str) -> RoutineTimes:
+    """
+    Parse routine times from user context with flexible patterns
+    """
+    def find(pattern: re.Pattern) -> Optional[time]:
+        match = pattern.search(user_context)
+        return _parse_hhmm(match.group(1)) if match else None
+    
+    work_match = _WORK_HOURS_RE.search(user_context)
+    return RoutineTimes(
+        wake=find(_WAKE_RE),
+        work_start=_parse_hhmm(work_match.group(1)) if work_match else None,
+        work_end=_parse_hhmm(work_match.group(2)) if work_match else None,
+        gym=find(_GYM_RE),
+        lunch=find(_LUNCH_RE),
+        dinner=find(_DINNER_RE),
+        sleep=find(_SLEEP_RE)
+    )
+
+
+def _normalize_to_window(t: datetime, routine: RoutineTimes, duration: timedelta) -> tuple:
+    """
+    Clamp t forward to the day's wake / work start and return (start, end)
+    """
+    day = t.date()
+    if routine.wake and t.time() < routine.wake:
+        t = datetime.combine(day, routine.wake)
+    if routine.work_start and t.time() < routine.work_start:
+        t = datetime.combine(day, routine.work_start)
+    return t, t + duration
 
 
 async def find_next_available_slot(
@@ -23,102 +166,90 @@ async def find_next_available_slot(
 ) -> datetime:
     """
     Find the next available time slot that doesn't conflict with existing events or routine
+
+    The scan and its queries are synchronous, so they run in a worker thread to
+    keep the event loop free.
     """
-    from datetime import timedelta, time
-    from app.models.calendar import CalendarEvent
-    import re
-    
+    return await asyncio.to_thread(
+        _find_next_available_slot_sync,
+        user_id,
+        preferred_start_time,
+        duration_minutes,
+        user_context,
+        db
+    )
+
+
+def _find_next_available_slot_sync(
+    user_id: int,
+    preferred_start_time: datetime,
+    duration_minutes: int,
+    user_context: str,
+    db: Session
+) -> datetime:
+    """
+    Synchronous core of find_next_available_slot
+    """
+    routine = _parse_routine_times(user_context)
+    duration = timedelta(minutes=duration_minutes)
     current_time = preferred_start_time
     max_attempts = 20  # Prevent infinite loops
     attempts = 0
     
     while attempts < max_attempts:
-        end_time = current_time + timedelta(minutes=duration_minutes)
-        
-        # Parse routine times from user context
-        
-        # Parse routine times from user context with flexible patterns
-        gym_match = re.search(r'[Gg]ym[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-        lunch_match = re.search(r'[Ll]unch[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-        dinner_match = re.search(r'[Dd]inner[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-        sleep_match = re.search(r'[Ss]leep[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-        wake_match = re.search(r'[Ww]ake[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-        work_match = re.search(r'[Ww]ork[^:]*:\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})', user_context)
-        
-        # Process routine time matches for scheduling optimization
+        # Don't schedule before wake up or before work starts
+        current_time, end_time = _normalize_to_window(current_time, routine, duration)
         
         routine_times = []
         
-        # Wake up time - don't schedule before wake up
-        if wake_match:
-            wake_time = datetime.strptime(wake_match.group(1), '%H:%M').time()
-            if current_time.time() < wake_time:
-                # Move to wake up time
-                current_time = datetime.combine(current_time.date(), wake_time)
-                end_time = current_time + timedelta(minutes=duration_minutes)
-        
         # Work hours - use as scheduling boundaries
-        if work_match:
-            work_start_time = datetime.strptime(work_match.group(1), '%H:%M').time()
-            work_end_time = datetime.strptime(work_match.group(2), '%H:%M').time()
-            
-            work_start_datetime = datetime.combine(current_time.date(), work_start_time)
-            work_end_datetime = datetime.combine(current_time.date(), work_end_time)
-            
-            # Don't schedule before work starts
-            if current_time < work_start_datetime:
-                current_time = work_start_datetime
-                end_time = current_time + timedelta(minutes=duration_minutes)
+        if routine.work_start and routine.work_end:
+            work_end_datetime = datetime.combine(current_time.date(), routine.work_end)
             
             # Don't schedule after work ends or if task would run past work hours
             if current_time >= work_end_datetime or end_time >= work_end_datetime:
                 # Move to next day work start
                 next_day = current_time + timedelta(days=1)
-                return datetime.combine(next_day.date(), work_start_time)
+                return datetime.combine(next_day.date(), routine.work_start)
         
         # Gym time - 2 HOUR BLOCK (30 min before + 90 min actual + 30 min after for shower/change)
-        if gym_match:
-            gym_time = datetime.strptime(gym_match.group(1), '%H:%M').time()
-            gym_actual_start = datetime.combine(current_time.date(), gym_time)
+        if routine.gym:
+            gym_actual_start = datetime.combine(current_time.date(), routine.gym)
             # Block from 30 min before to 30 min after (2 hours total)
             gym_block_start = gym_actual_start - timedelta(minutes=30)  # prep time
             gym_block_end = gym_actual_start + timedelta(hours=1, minutes=30)  # 90min gym + 30min recovery
             routine_times.append((gym_block_start, gym_block_end, 'gym'))
             
         # Lunch time - 1 hour block
-        if lunch_match:
-            lunch_time = datetime.strptime(lunch_match.group(1), '%H:%M').time()
-            lunch_start = datetime.combine(current_time.date(), lunch_time)
+        if routine.lunch:
+            lunch_start = datetime.combine(current_time.date(), routine.lunch)
             lunch_end = lunch_start + timedelta(hours=1)  # Full hour for lunch
             routine_times.append((lunch_start, lunch_end, 'lunch'))
             
         # Dinner time - 1.5 hour block (cooking + eating + cleanup)
-        if dinner_match:
-            dinner_time = datetime.strptime(dinner_match.group(1), '%H:%M').time()
-            dinner_start = datetime.combine(current_time.date(), dinner_time)
+        if routine.dinner:
+            dinner_start = datetime.combine(current_time.date(), routine.dinner)
             dinner_end = dinner_start + timedelta(hours=1, minutes=30)
             routine_times.append((dinner_start, dinner_end, 'dinner'))
             
         # Sleep time - HARD CUT OFF
-        if sleep_match:
-            sleep_time = datetime.strptime(sleep_match.group(1), '%H:%M').time()
-            sleep_start = datetime.combine(current_time.date(), sleep_time)
+        if routine.sleep:
+            sleep_start = datetime.combine(current_time.date(), routine.sleep)
             # Don't schedule anything after sleep time or if task would run past sleep
             if current_time >= sleep_start or end_time >= sleep_start:
                 # Move to next day after wake up
                 next_day = current_time + timedelta(days=1)
-                if wake_match:
-                    wake_time = datetime.strptime(wake_match.group(1), '%H:%M').time()
-                    return datetime.combine(next_day.date(), wake_time)
-                elif work_match:
-                    work_start_time = datetime.strptime(work_match.group(1), '%H:%M').time()
-                    return datetime.combine(next_day.date(), work_start_time)
+                if routine.wake:
+                    return datetime.combine(next_day.date(), routine.wake)
+                elif routine.work_start:
+                    return datetime.combine(next_day.date(), routine.work_start)
                 else:
                     return next_day.replace(hour=8, minute=0, second=0)
         
         # Processing routine time constraints
-        for start, end, name in routine_times:
-            print(f"  - {name}: {start.strftime('%H:%M')} - {end.strftime('%H:%M')}")
+        if logger.isEnabledFor(logging.DEBUG):
+            for start, end, name in routine_times:
+                logger.debug(f"  - {name}: {start.strftime('%H:%M')} - {end.strftime('%H:%M')}")
         
         # Evaluating time slot availability
         
@@ -127,9 +258,9 @@ async def find_next_available_slot(
         for routine_start, routine_end, routine_type in routine_times:
             if (current_time < routine_end and end_time > routine_start):
                 # There's a conflict, move past this routine block
-                print(f"⚠️ CONFLICT: Task conflicts with {routine_type} ({routine_start.strftime('%H:%M')} - {routine_end.strftime('%H:%M')})")
+                logger.debug(f"⚠️ CONFLICT: Task conflicts with {routine_type} ({routine_start.strftime('%H:%M')} - {routine_end.strftime('%H:%M')})")
                 current_time = routine_end + timedelta(minutes=15)  # 15 min buffer after routine
-                print(f"🔄 RESCHEDULED: Moving task to {current_time.strftime('%H:%M')}")
+                logger.debug(f"🔄 RESCHEDULED: Moving task to {current_time.strftime('%H:%M')}")
                 has_routine_conflict = True
                 break
                 
@@ -167,135 +298,189 @@ async def find_next_available_slot(
     
     if preferred_start_time.date() >= tomorrow:
         # Already trying tomorrow or later, don't go further
-        print(f"⚠️ SCHEDULING LIMIT: Cannot schedule beyond tomorrow ({tomorrow})")
+        logger.warning(f"⚠️ SCHEDULING LIMIT: Cannot schedule beyond tomorrow ({tomorrow})")
         return datetime.combine(tomorrow, time(11, 0))  # Return tomorrow at 11 AM as final fallback
     
     return preferred_start_time.replace(hour=9, minute=0, second=0) + timedelta(days=1)
 
 
-def create_routine_blocks(user_context: str, date: date) -> list:
+@lru_cache(maxsize=128)
+def _routine_template(user_context: str) -> tuple:
     """
-    Create time blocks for all routine activities that should be protected
+    Parse the routine in user_context into date-independent protected blocks
+
+    Each entry is (start_offset, end_offset, type, description) where the
+    offsets are measured from midnight of the day being scheduled. Overlapping
+    blocks are merged, so the result is sorted and pairwise disjoint.
     """
-    from datetime import time, datetime, timedelta
-    import re
-    
+    midnight = timedelta(0)
     blocks = []
     
     # Parse routine times with flexible patterns
-    wake_match = re.search(r'[Ww]ake[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-    gym_match = re.search(r'[Gg]ym[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-    lunch_match = re.search(r'[Ll]unch[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-    dinner_match = re.search(r'[Dd]inner[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-    sleep_match = re.search(r'[Ss]leep[^:]*:\s*(\d{1,2}:\d{2})', user_context)
-    work_match = re.search(r'[Ww]ork[^:]*:\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})', user_context)
+    wake_match = _WAKE_RE.search(user_context)
+    gym_match = _GYM_RE.search(user_context)
+    lunch_match = _LUNCH_RE.search(user_context)
+    dinner_match = _DINNER_RE.search(user_context)
+    sleep_match = _SLEEP_RE.search(user_context)
+    work_match = _WORK_HOURS_RE.search(user_context)
+    
+    wake_time = _parse_hhmm(wake_match.group(1)) if wake_match else None
+    sleep_time = _parse_hhmm(sleep_match.group(1)) if sleep_match else None
     
     # Before wake up - BLOCKED
-    if wake_match:
-        wake_time = datetime.strptime(wake_match.group(1), '%H:%M').time()
-        blocks.append({
-            'start': datetime.combine(date, time(0, 0)),
-            'end': datetime.combine(date, wake_time),
-            'type': 'sleep/wake',
-            'description': 'Before wake up time'
-        })
+    if wake_time:
+        blocks.append((midnight, _clock_offset(wake_time), 'sleep/wake', 'Before wake up time'))
     
     # Gym - 2 HOUR PROTECTED BLOCK
     if gym_match:
-        gym_time = datetime.strptime(gym_match.group(1), '%H:%M').time()
-        gym_start = datetime.combine(date, gym_time) - timedelta(minutes=30)  # 30 min prep
-        gym_end = datetime.combine(date, gym_time) + timedelta(hours=1, minutes=30)  # 90 min + 30 min recovery
-        blocks.append({
-            'start': gym_start,
-            'end': gym_end,
-            'type': 'gym',
-            'description': f'Gym block with prep/recovery: {gym_start.strftime("%H:%M")} - {gym_end.strftime("%H:%M")}'
-        })
+        gym_time = _parse_hhmm(gym_match.group(1))
+        gym_start = _clock_offset(gym_time) - timedelta(minutes=30)  # 30 min prep
+        gym_end = _clock_offset(gym_time) + timedelta(hours=1, minutes=30)  # 90 min + 30 min recovery
+        blocks.append((
+            gym_start,
+            gym_end,
+            'gym',
+            f'Gym block with prep/recovery: {_format_offset(gym_start)} - {_format_offset(gym_end)}'
+        ))
     
     # Lunch - 1 HOUR BLOCK
     if lunch_match:
-        lunch_time = datetime.strptime(lunch_match.group(1), '%H:%M').time()
-        lunch_start = datetime.combine(date, lunch_time)
+        lunch_start = _clock_offset(_parse_hhmm(lunch_match.group(1)))
         lunch_end = lunch_start + timedelta(hours=1)
-        blocks.append({
-            'start': lunch_start,
-            'end': lunch_end,
-            'type': 'lunch',
-            'description': f'Lunch: {lunch_start.strftime("%H:%M")} - {lunch_end.strftime("%H:%M")}'
-        })
+        blocks.append((
+            lunch_start,
+            lunch_end,
+            'lunch',
+            f'Lunch: {_format_offset(lunch_start)} - {_format_offset(lunch_end)}'
+        ))
     
     # Dinner - 1.5 HOUR BLOCK
     if dinner_match:
-        dinner_time = datetime.strptime(dinner_match.group(1), '%H:%M').time()
-        dinner_start = datetime.combine(date, dinner_time)
+        dinner_start = _clock_offset(_parse_hhmm(dinner_match.group(1)))
         dinner_end = dinner_start + timedelta(hours=1, minutes=30)
-        blocks.append({
-            'start': dinner_start,
-            'end': dinner_end,
-            'type': 'dinner',
-            'description': f'Dinner: {dinner_start.strftime("%H:%M")} - {dinner_end.strftime("%H:%M")}'
-        })
+        blocks.append((
+            dinner_start,
+            dinner_end,
+            'dinner',
+            f'Dinner: {_format_offset(dinner_start)} - {_format_offset(dinner_end)}'
+        ))
     
-    # After sleep - BLOCKED
-    if sleep_match:
-        sleep_time = datetime.strptime(sleep_match.group(1), '%H:%M').time()
-        blocks.append({
-            'start': datetime.combine(date, sleep_time),
-            'end': datetime.combine(date + timedelta(days=1), time(23, 59)),
-            'type': 'sleep',
-            'description': f'After sleep time: {sleep_time}'
-        })
+    # After sleep - BLOCKED until the end of the following day
+    if sleep_time:
+        blocks.append((
+            _clock_offset(sleep_time),
+            timedelta(days=1) + _clock_offset(time(23, 59)),
+            'sleep',
+            f'After sleep time: {sleep_time}'
+        ))
     
     # Work boundaries
     if work_match:
-        work_start_time = datetime.strptime(work_match.group(1), '%H:%M').time()
-        work_end_time = datetime.strptime(work_match.group(2), '%H:%M').time()
+        work_start_time = _parse_hhmm(work_match.group(1))
+        work_end_time = _parse_hhmm(work_match.group(2))
         
         # Before work hours - BLOCKED
-        if wake_match:
-            wake_time = datetime.strptime(wake_match.group(1), '%H:%M').time()
-            if wake_time < work_start_time:  # Only block if there's gap between wake and work
-                blocks.append({
-                    'start': datetime.combine(date, wake_time),
-                    'end': datetime.combine(date, work_start_time),
-                    'type': 'pre-work',
-                    'description': f'Before work hours: {wake_time} - {work_start_time}'
-                })
+        if wake_time and wake_time < work_start_time:  # Only block if there's gap between wake and work
+            blocks.append((
+                _clock_offset(wake_time),
+                _clock_offset(work_start_time),
+                'pre-work',
+                f'Before work hours: {wake_time} - {work_start_time}'
+            ))
         
         # After work hours - BLOCKED (unless it's dinner/gym time)
-        work_end_datetime = datetime.combine(date, work_end_time)
-        if sleep_match:
-            sleep_time = datetime.strptime(sleep_match.group(1), '%H:%M').time()
-            sleep_datetime = datetime.combine(date, sleep_time)
-            if work_end_datetime < sleep_datetime:
-                blocks.append({
-                    'start': work_end_datetime,
-                    'end': sleep_datetime,
-                    'type': 'post-work',
-                    'description': f'After work hours: {work_end_time} - {sleep_time}'
-                })
-    
-    # Sort blocks by start time
-    blocks.sort(key=lambda x: x['start'])
+        if sleep_time and work_end_time < sleep_time:
+            blocks.append((
+                _clock_offset(work_end_time),
+                _clock_offset(sleep_time),
+                'post-work',
+                f'After work hours: {work_end_time} - {sleep_time}'
+            ))
     
-    print(f"🛡️ Created {len(blocks)} protected time blocks:")
+    # Sort blocks by start time and merge overlaps (e.g. lunch inside post-work)
+    blocks.sort(key=lambda block: block[0])
+    merged = []
     for block in blocks:
-        print(f"  - {block['type']}: {block['start'].strftime('%H:%M')} - {block['end'].strftime('%H:%M')} ({block['description']})")
+        if merged and block[0] <= merged[-1][1]:
+            last = merged[-1]
+            merged[-1] = (
+                last[0],
+                max(last[1], block[1]),
+                f"{last[2]}+{block[2]}",
+                f"{last[3]}; {block[3]}"
+            )
+        else:
+            merged.append(block)
+    return tuple(merged)
+
+
+def _clock_offset(value: time) -> timedelta:
+    """
+    Offset of a clock time from midnight
+    """
+    return timedelta(hours=value.hour, minutes=value.minute)
+
+
+def _format_offset(value: timedelta) -> str:
+    """
+    Format a midnight offset as HH:MM clock time
+    """
+    minutes = int(value.total_seconds() // 60) % (24 * 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def create_routine_blocks(user_context: str, date: date) -> list:
+    """
+    Create time blocks for all routine activities that should be protected
+    """
+    day_start = datetime.combine(date, time(0, 0))
+    blocks = [
+        {
+            'start': day_start + start_offset,
+            'end': day_start + end_offset,
+            'type': block_type,
+            'description': description
+        }
+        for start_offset, end_offset, block_type, description in _routine_template(user_context)
+    ]
+    
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"🛡️ Created {len(blocks)} protected time blocks:")
+        for block in blocks:
+            logger.debug(f"  - {block['type']}: {block['start'].strftime('%H:%M')} - {block['end'].strftime('%H:%M')} ({block['description']})")
     
     return blocks
 
 
-def find_next_work_slot(start_time: datetime, routine_blocks: list, user_context: str) -> datetime:
+class RoutineIndex:
     """
-    Find the next available work time slot that doesn't conflict with routine blocks
+    A day's routine blocks (sorted and disjoint) with bisect lookups by end time
     """
-    import re
     
+    def __init__(self, routine_blocks: list):
+        self.blocks = routine_blocks
+        self._ends = [block['end'] for block in routine_blocks]
+    
+    def first_ending_after(self, moment: datetime) -> Optional[dict]:
+        """
+        Return the first block that ends after moment, or None
+        
+        Blocks are disjoint, so this is the only block that can contain moment
+        and the first one a task starting at moment can run into.
+        """
+        idx = bisect_right(self._ends, moment)
+        return self.blocks[idx] if idx < len(self.blocks) else None
+
+
+def find_next_work_slot(start_time: datetime, routine_index: RoutineIndex, user_context: str) -> datetime:
+    """
+    Find the next available work time slot that doesn't conflict with routine blocks
+    """
     # Parse work hours
-    work_match = re.search(r'[Ww]ork[^:]*:\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})', user_context)
+    work_match = _WORK_HOURS_RE.search(user_context)
     if work_match:
-        work_start_time = datetime.strptime(work_match.group(1), '%H:%M').time()
-        work_end_time = datetime.strptime(work_match.group(2), '%H:%M').time()
+        work_start_time = _parse_hhmm(work_match.group(1))
+        work_end_time = _parse_hhmm(work_match.group(2))
     else:
         work_start_time = time(9, 0)
         work_end_time = time(18, 0)
@@ -309,7 +494,7 @@ def find_next_work_slot(start_time: datetime, routine_blocks: list, user_context
     
     # Fix problematic work end times (e.g., 02:00 should be 19:00)
     if work_end_time.hour <= 6:
-        print(f"⚠️ WARNING: Unusual work end time {work_end_time}, adjusting to 19:00")
+        logger.warning(f"⚠️ WARNING: Unusual work end time {work_end_time}, adjusting to 19:00")
         work_end_time = time(19, 0)
         work_end_datetime = datetime.combine(current_date, work_end_time)
     
@@ -327,7 +512,7 @@ def find_next_work_slot(start_time: datetime, routine_blocks: list, user_context
             
             if current_time.date() >= tomorrow:
                 # Already on tomorrow or later, don't schedule beyond tomorrow
-                print(f"⚠️ WARNING: Reached scheduling limit (tomorrow), stopping at {current_time.date()}")
+                logger.warning(f"⚠️ WARNING: Reached scheduling limit (tomorrow), stopping at {current_time.date()}")
                 return datetime.combine(tomorrow, work_start_time)
             
             # Move to tomorrow's work start
@@ -344,13 +529,12 @@ def find_next_work_slot(start_time: datetime, routine_blocks: list, user_context
     while attempts < max_attempts:
         # Check if current time conflicts with any routine block
         conflicts = False
-        for block in routine_blocks:
-            if current_time >= block['start'] and current_time < block['end']:
-                # We're in a blocked period, move past it
-                current_time = block['end'] + timedelta(minutes=15)  # 15 min buffer
-                conflicts = True
-                print(f"⚠️ Conflict with {block['type']}, moving to {current_time.strftime('%H:%M')}")
-                break
+        block = routine_index.first_ending_after(current_time)
+        if block and block['start'] <= current_time:
+            # We're in a blocked period, move past it
+            current_time = block['end'] + timedelta(minutes=15)  # 15 min buffer
+            conflicts = True
+            logger.debug(f"⚠️ Conflict with {block['type']}, moving to {current_time.strftime('%H:%M')}")
         
         if not conflicts:
             # Check if we're still within work hours
@@ -369,23 +553,65 @@ def find_next_work_slot(start_time: datetime, routine_blocks: list, user_context
     return datetime.combine(next_day.date(), work_start_time)
 
 
+class EventIndex:
+    """
+    Request-scoped, start-sorted view of a user's calendar events
+
+    Loaded once per scheduling request so sequential placement checks conflicts
+    in memory instead of re-querying the day's events for every task.
+    """
+    
+    def __init__(self, events: list):
+        self._events = sorted((event.start_time, event.end_time, event.title) for event in events)
+        self._starts = [start for start, _, _ in self._events]
+        self._max_span = max((end - start for start, end, _ in self._events), default=timedelta(0))
+    
+    @classmethod
+    def load(cls, db: Session, user_id: int, range_start: datetime, range_end: datetime) -> "EventIndex":
+        # Only the columns conflict checks need, and anything overlapping the
+        # window - an event that started before range_start can still block it
+        events = db.execute(
+            select(CalendarEvent.start_time, CalendarEvent.end_time, CalendarEvent.title).where(
+                CalendarEvent.user_id == user_id,
+                CalendarEvent.start_time < range_end,
+                CalendarEvent.end_time > range_start
+            )
+        ).all()
+        return cls(events)
+    
+    def first_conflict(self, start_time: datetime, end_time: datetime) -> Optional[tuple]:
+        """
+        Return (start, end, title) of the earliest event overlapping [start_time, end_time)
+        """
+        # Nothing starting before start_time - max_span can still reach start_time
+        lo = bisect_left(self._starts, start_time - self._max_span)
+        hi = bisect_left(self._starts, end_time)
+        for event in self._events[lo:hi]:
+            if event[1] > start_time:
+                return event
+        return None
+    
+    def insert(self, start_time: datetime, end_time: datetime, title: str) -> None:
+        event = (start_time, end_time, title)
+        insort(self._events, event)
+        insort(self._starts, start_time)
+        self._max_span = max(self._max_span, end_time - start_time)
+
+
 def schedule_task_sequentially(
     task_start_time: datetime,
     duration_minutes: int,
-    routine_blocks: list,
+    routine_index: RoutineIndex,
     user_context: str,
-    db: Session,
-    user_id: int
+    event_index: EventIndex
 ) -> datetime:
     """
     Schedule a single task, ensuring no conflicts and returning the actual scheduled time
     """
-    import re
-    
     # Parse work hours for boundaries
-    work_match = re.search(r'[Ww]ork[^:]*:\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})', user_context)
+    work_match = _WORK_HOURS_RE.search(user_context)
     if work_match:
-        work_end_time = datetime.strptime(work_match.group(2), '%H:%M').time()
+        work_end_time = _parse_hhmm(work_match.group(2))
     else:
         work_end_time = time(18, 0)
     
@@ -397,55 +623,42 @@ def schedule_task_sequentially(
     if task_end_time > work_end_datetime:
         # Move to next day
         next_day = current_time + timedelta(days=1)
-        work_start_time = datetime.strptime(work_match.group(1), '%H:%M').time() if work_match else time(9, 0)
+        work_start_time = _parse_hhmm(work_match.group(1)) if work_match else time(9, 0)
         return schedule_task_sequentially(
             datetime.combine(next_day.date(), work_start_time),
             duration_minutes,
-            routine_blocks,
+            routine_index,
             user_context,
-            db,
-            user_id
+            event_index
         )
     
     # Check for conflicts with routine blocks
-    for block in routine_blocks:
-        # Check if task overlaps with any routine block
-        if (current_time < block['end'] and task_end_time > block['start']):
-            # Conflict! Move past this block
-            new_start_time = block['end'] + timedelta(minutes=15)  # 15 min buffer
-            print(f"⚠️ Task conflicts with {block['type']} block, rescheduling to {new_start_time.strftime('%H:%M')}")
-            return schedule_task_sequentially(
-                new_start_time,
-                duration_minutes,
-                routine_blocks,
-                user_context,
-                db,
-                user_id
-            )
+    block = routine_index.first_ending_after(current_time)
+    if block and task_end_time > block['start']:
+        # Conflict! Move past this block
+        new_start_time = block['end'] + timedelta(minutes=15)  # 15 min buffer
+        logger.debug(f"⚠️ Task conflicts with {block['type']} block, rescheduling to {new_start_time.strftime('%H:%M')}")
+        return schedule_task_sequentially(
+            new_start_time,
+            duration_minutes,
+            routine_index,
+            user_context,
+            event_index
+        )
     
     # Check for conflicts with existing calendar events
-    from app.models.calendar import CalendarEvent
-    existing_events = db.query(CalendarEvent).filter(
-        CalendarEvent.user_id == user_id,
-        CalendarEvent.start_time.between(
-            current_time.replace(hour=0, minute=0, second=0),
-            current_time.replace(hour=23, minute=59, second=59)
+    conflict = event_index.first_conflict(current_time, task_end_time)
+    if conflict:
+        _, conflict_end, conflict_title = conflict
+        new_start_time = conflict_end + timedelta(minutes=15)
+        logger.debug(f"⚠️ Task conflicts with existing event '{conflict_title}', rescheduling to {new_start_time.strftime('%H:%M')}")
+        return schedule_task_sequentially(
+            new_start_time,
+            duration_minutes,
+            routine_index,
+            user_context,
+            event_index
         )
-    ).all()
-    
-    for event in existing_events:
-        if (current_time < event.end_time and task_end_time > event.start_time):
-            # Conflict with existing event
-            new_start_time = event.end_time + timedelta(minutes=15)
-            print(f"⚠️ Task conflicts with existing event '{event.title}', rescheduling to {new_start_time.strftime('%H:%M')}")
-            return schedule_task_sequentially(
-                new_start_time,
-                duration_minutes,
-                routine_blocks,
-                user_context,
-                db,
-                user_id
-            )
     
     # No conflicts, this time slot works
     return current_time
@@ -683,8 +896,38 @@ async def get_schedule_recommendations(
         raise HTTPException(status_code=500, detail=f"Failed to get recommendations: {str(e)}")
 
 
+def _sync_events_to_google(user_id: int, event_ids: List[int], payloads: List[Dict[str, Any]]):
+    """
+    Create already-saved events in Google Calendar and record their Google ids
+    """
+    if not google_calendar_service.is_calendar_connected(user_id):
+        return
+    
+    google_results = google_calendar_service.batch_create_calendar_events(user_id, payloads)
+    sync_updates = [
+        {
+            'id': event_id,
+            'google_event_id': google_result['event_id'],
+            'is_synced': True,
+            'sync_status': "synced"
+        }
+        for event_id, google_result in zip(event_ids, google_results)
+        if google_result['success']
+    ]
+    logger.info(f"📅 Synced {len(sync_updates)}/{len(payloads)} events to Google Calendar for user {user_id}")
+    
+    if sync_updates:
+        db = SessionLocal()
+        try:
+            db.execute(update(CalendarEvent), sync_updates)
+            db.commit()
+        finally:
+            db.close()
+
+
 @router.post("/bulk-schedule-from-goals")
 async def bulk_schedule_from_goals(
+    background_tasks: BackgroundTasks,
     days_ahead: int = 7,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -693,10 +936,6 @@ async def bulk_schedule_from_goals(
     Automatically schedule time blocks for all active goals
     """
     try:
-        from app.models.goal import Goal, GoalStatus
-        from app.models.calendar import CalendarEvent
-        from datetime import timedelta
-        
         # Get active goals
         active_goals = db.query(Goal).filter(
             Goal.user_id == current_user.id,
@@ -710,7 +949,10 @@ async def bulk_schedule_from_goals(
                 "scheduled_events": []
             }
         
-        scheduled_events = []
+        # Plan every session first, then write them with a single INSERT
+        planned_events = []
+        pending_events = []
+        session_info = []
         
         for goal in active_goals:
             # Calculate time needed based on goal progress and target date
@@ -733,67 +975,79 @@ async def bulk_schedule_from_goals(
                     'title': f"Goal Work: {goal.title}",
                     'description': f"Focused work session for goal: {goal.description or goal.title}",
                     'duration_minutes': min(120, max(30, minutes_per_session)),  # 30min to 2h
-                    'event_type': EventType.GOAL_WORK,
-                    'priority': EventPriority.HIGH,
+                    'event_type': _EVT_GOAL_WORK,
+                    'priority': _PRI_HIGH,
                     'goal_id': goal.id
                 }
                 
-                # Use the working calendar endpoint for proper Google sync
-                from app.services.google_calendar_service import GoogleCalendarService
-                
-                # Create AI-optimized time
+                # Create AI-optimized time, treating sessions planned so far as busy
                 optimal_time = await ai_calendar_service._find_optimal_time_for_event(
-                    current_user.id, event_data, {'optimal_time_of_day': 'morning'}, db
+                    current_user.id, event_data, {'optimal_time_of_day': 'morning'}, db,
+                    pending_events=pending_events
                 )
                 
                 if optimal_time:
                     start_time = optimal_time['start_time']
                     end_time = start_time + timedelta(minutes=event_data['duration_minutes'])
                     
-                    # Create local event
-                    calendar_event = CalendarEvent(
-                        user_id=current_user.id,
-                        title=event_data['title'],
-                        description=event_data['description'],
-                        start_time=start_time,
-                        end_time=end_time,
-                        event_type=event_data['event_type'],
-                        goal_id=event_data['goal_id'],
-                        priority=event_data['priority'],
-                        contributes_to_goal=True,
-                        auto_scheduled=True
-                    )
-                    
-                    db.add(calendar_event)
-                    db.commit()
-                    db.refresh(calendar_event)
-                    
-                    # Sync to Google Calendar
-                    google_service = GoogleCalendarService()
-                    if google_service.is_calendar_connected(current_user.id):
-                        google_result = google_service.create_calendar_event(
-                            current_user.id,
-                            {
-                                'title': event_data['title'],
-                                'description': f"{event_data['description']}\n\n🤖 AI-scheduled for optimal productivity\n🎯 Goal-focused work session",
-                                'start_time': start_time,
-                                'end_time': end_time
-                            }
-                        )
-                        
-                        if google_result['success']:
-                            calendar_event.google_event_id = google_result['event_id']
-                            calendar_event.is_synced = True
-                            calendar_event.sync_status = "synced"
-                            db.commit()
-                    
-                    scheduled_events.append({
-                        'goal_title': goal.title,
-                        'event_id': calendar_event.id,
-                        'scheduled_time': start_time.isoformat(),
-                        'duration_minutes': event_data['duration_minutes'],
-                        'google_synced': google_result.get('success', False) if 'google_result' in locals() else False
+                    planned_events.append({
+                        'user_id': current_user.id,
+                        'title': event_data['title'],
+                        'description': event_data['description'],
+                        'start_time': start_time,
+                        'end_time': end_time,
+                        'event_type': event_data['event_type'],
+                        'goal_id': event_data['goal_id'],
+                        'priority': event_data['priority'],
+                        'contributes_to_goal': True,
+                        'auto_scheduled': True
+                    })
+                    pending_events.append({
+                        'id': None,
+                        'title': event_data['title'],
+                        'start_time': start_time,
+                        'end_time': end_time,
+                        'is_all_day': False
                     })
+                    session_info.append((goal.title, event_data['duration_minutes']))
+        
+        event_ids = []
+        if planned_events:
+            # Create local events in one round-trip
+            event_ids = db.scalars(
+                insert(CalendarEvent).returning(CalendarEvent.id, sort_by_parameter_order=True),
+                planned_events
+            ).all()
+            db.commit()
+        
+        # Sync to Google Calendar after the response is sent
+        if planned_events:
+            background_tasks.add_task(
+                _sync_events_to_google,
+                current_user.id,
+                event_ids,
+                [
+                    {
+                        'title': row['title'],
+                        'description': f"{row['description']}\n\n🤖 AI-scheduled for optimal productivity\n🎯 Goal-focused work session",
+                        'start_time': row['start_time'],
+                        'end_time': row['end_time']
+                    }
+                    for row in planned_events
+                ]
+            )
+        
+        scheduled_events = [
+            {
+                'goal_title': goal_title,
+                'event_id': event_id,
+                'scheduled_time': row['start_time'].isoformat(),
+                'duration_minutes': duration_minutes,
+                'google_synced': "pending"
+            }
+            for (goal_title, duration_minutes), event_id, row
+            in zip(session_info, event_ids, planned_events)
+        ]
         
         return {
             "success": True,
@@ -806,9 +1060,110 @@ async def bulk_schedule_from_goals(
         raise HTTPException(status_code=500, detail=f"Failed to bulk schedule from goals: {str(e)}")
 
 
+# Markdown code fence some models wrap around JSON output
+_JSON_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+
+
+def _parse_llm_json(text: str):
+    """Parse an LLM's JSON reply, tolerating a surrounding ```json fence"""
+    return orjson.loads(_JSON_FENCE.sub("", text))
+
+
+# Static part of the intent classification prompt
+_INTENT_INSTRUCTIONS = """DETERMINE THE INTENT:
+1. CREATE_TASKS - User wants to create new tasks/events (e.g., "I need to focus on lead generation")
+2. EDIT_EVENT - User wants to modify existing event (e.g., "Move my meeting to 3 PM", "Change the gym session to 4 PM")
+3. RESCHEDULE_EVENT - User wants to reschedule event (e.g., "Reschedule the presentation prep", "Move tomorrow's call")
+4. DELETE_EVENT - User wants to delete/cancel event (e.g., "Cancel the client call", "Remove the marketing task")
+5. BULK_DELETE - User wants to delete ALL events or multiple events (e.g., "Delete all events", "Clear my calendar", "Remove everything", "Delete all the events you added")
+6. VIEW_SCHEDULE - User wants to see their schedule (e.g., "What's my schedule like?", "What do I have tomorrow?")
+7. OPTIMIZE_SCHEDULE - User wants to rearrange/optimize existing schedule (e.g., "Reorganize my day", "Find better times")
+8. BULK_MODIFY_DURATION - User wants to adjust duration of multiple events (e.g., "make all tasks 30 minutes", "shorten all events", "each task only needs 30 min")
+
+Call classify_intent with your answer."""
+
+# Structured output for the intent classifier
+_INTENT_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "classify_intent",
+        "description": "Record the intent of the user's calendar request and the details needed to act on it",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "intent": {
+                    "type": "string",
+                    "enum": [
+                        "CREATE_TASKS", "EDIT_EVENT", "RESCHEDULE_EVENT", "DELETE_EVENT",
+                        "BULK_DELETE", "VIEW_SCHEDULE", "OPTIMIZE_SCHEDULE", "BULK_MODIFY_DURATION"
+                    ]
+                },
+                "confidence": {"type": "number", "description": "0.0 to 1.0"},
+                "extracted_info": {
+                    "type": "object",
+                    "properties": {
+                        "target_event_keywords": {"type": "array", "items": {"type": "string"}},
+                        "target_time": {"type": "string", "description": "HH:MM, 24-hour"},
+                        "target_date": {"type": "string", "description": "YYYY-MM-DD"},
+                        "duration_minutes": {"type": "integer"},
+                        "new_title": {"type": "string"},
+                        "reasoning": {"type": "string", "description": "Why this intent was chosen"}
+                    },
+                    "required": ["target_event_keywords", "reasoning"]
+                }
+            },
+            "required": ["intent", "confidence", "extracted_info"]
+        }
+    }
+}
+
+
+# Columns the assistant's handlers read or write; everything else stays unloaded
+_ASSISTANT_EVENT_COLUMNS = (
+    CalendarEvent.id,
+    CalendarEvent.user_id,
+    CalendarEvent.title,
+    CalendarEvent.description,
+    CalendarEvent.start_time,
+    CalendarEvent.end_time,
+    CalendarEvent.event_type,
+    CalendarEvent.priority,
+    CalendarEvent.contributes_to_goal,
+    CalendarEvent.google_event_id,
+    CalendarEvent.reschedule_count,
+)
+
+
+def _upcoming_events_criteria(user_id: int) -> tuple:
+    """
+    WHERE criteria for the user's events from today through the next 7 days
+    """
+    now = datetime.now()
+    range_start = datetime(now.year, now.month, now.day)
+    # Half-open range: midnight after the 7th day is excluded, everything before it is kept
+    range_end = range_start + timedelta(days=8)
+    return (
+        CalendarEvent.user_id == user_id,
+        CalendarEvent.start_time >= range_start,
+        CalendarEvent.start_time < range_end
+    )
+
+
+def _load_upcoming_events(db: Session, user_id: int) -> list:
+    """
+    Load the user's events from today through the next 7 days, ordered by start
+    """
+    return db.query(CalendarEvent).options(
+        load_only(*_ASSISTANT_EVENT_COLUMNS)
+    ).filter(
+        *_upcoming_events_criteria(user_id)
+    ).order_by(CalendarEvent.start_time).all()
+
+
 @router.post("/intelligent-calendar-assistant")
 async def intelligent_calendar_assistant(
     request: dict,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -829,25 +1184,26 @@ async def intelligent_calendar_assistant(
         user_context = request.get('user_context', '')
         
         # First, let AI analyze the request to determine the intent
-        import openai
-        from app.core.config import settings
-        import os
-        
-        # Get API key same way as in OpenAI service
-        api_key = os.getenv("OPENAI_API_KEY") or settings.openai_api_key
-        if not api_key:
+        client = _get_openai_client()
+        if client is None:
             raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-            
-        client = openai.OpenAI(api_key=api_key)
         
-        # Get current calendar events for context
-        from app.models.calendar import CalendarEvent
-        today = datetime.now().date()
-        current_events = db.query(CalendarEvent).filter(
-            CalendarEvent.user_id == current_user.id,
-            CalendarEvent.start_time >= datetime.combine(today, time(0, 0)),
-            CalendarEvent.start_time <= datetime.combine(today + timedelta(days=7), time(23, 59))
-        ).order_by(CalendarEvent.start_time).all()
+        # Get current calendar events for context in a worker thread, overlapping
+        # the intent matching and embedding below. db belongs to that thread
+        # until the fetch is awaited
+        events_task = asyncio.create_task(asyncio.to_thread(_load_upcoming_events, db, current_user.id))
+        
+        # Unambiguous requests are classified locally; recurring phrasings reuse a
+        # cached classification; everything else goes to GPT-4
+        try:
+            request_embedding = None
+            intent_analysis = match_intent(user_request)
+            if intent_analysis is None:
+                request_embedding = await intent_cache.embed(client, user_request)
+                if request_embedding:
+                    intent_analysis = intent_cache.lookup(current_user.id, request_embedding)
+        finally:
+            current_events = await events_task
         
         calendar_context = ""
         if current_events:
@@ -855,7 +1211,8 @@ async def intelligent_calendar_assistant(
             for event in current_events[:10]:  # Limit to 10 events for context
                 calendar_context += f"- {event.title} ({event.start_time.strftime('%Y-%m-%d %H:%M')} - {event.end_time.strftime('%H:%M')}) [ID: {event.id}]\n"
         
-        intent_analysis_prompt = f"""
+        if intent_analysis is None:
+            intent_analysis_prompt = f"""
 You are an AI Calendar Assistant. Analyze the user's request and determine the intent and action needed.
 
 User Context: {user_context}
@@ -864,58 +1221,39 @@ User Context: {user_context}
 
 User Request: "{user_request}"
 
-DETERMINE THE INTENT:
-1. CREATE_TASKS - User wants to create new tasks/events (e.g., "I need to focus on lead generation")
-2. EDIT_EVENT - User wants to modify existing event (e.g., "Move my meeting to 3 PM", "Change the gym session to 4 PM")
-3. RESCHEDULE_EVENT - User wants to reschedule event (e.g., "Reschedule the presentation prep", "Move tomorrow's call")
-4. DELETE_EVENT - User wants to delete/cancel event (e.g., "Cancel the client call", "Remove the marketing task")
-5. BULK_DELETE - User wants to delete ALL events or multiple events (e.g., "Delete all events", "Clear my calendar", "Remove everything", "Delete all the events you added")
-6. VIEW_SCHEDULE - User wants to see their schedule (e.g., "What's my schedule like?", "What do I have tomorrow?")
-7. OPTIMIZE_SCHEDULE - User wants to rearrange/optimize existing schedule (e.g., "Reorganize my day", "Find better times")
-8. BULK_MODIFY_DURATION - User wants to adjust duration of multiple events (e.g., "make all tasks 30 minutes", "shorten all events", "each task only needs 30 min")
-
-Return JSON:
-{{
-  "intent": "CREATE_TASKS|EDIT_EVENT|RESCHEDULE_EVENT|DELETE_EVENT|BULK_DELETE|VIEW_SCHEDULE|OPTIMIZE_SCHEDULE|BULK_MODIFY_DURATION",
-  "confidence": 0.9,
-  "extracted_info": {{
-    "target_event_keywords": ["keyword1", "keyword2"],
-    "target_time": "15:00",
-    "target_date": "2025-08-21",
-    "duration_minutes": 30,
-    "new_title": "Updated title",
-    "reasoning": "Why this intent was chosen"
-  }}
-}}
+{_INTENT_INSTRUCTIONS}
 """
-        
-        intent_response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": intent_analysis_prompt},
-                {"role": "user", "content": user_request}
-            ],
-            temperature=0.3
-        )
-        
-        import json
-        intent_analysis = json.loads(intent_response.choices[0].message.content)
-        print(f"🤖 AI Intent Analysis: {intent_analysis}")
+            
+            intent_response = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": intent_analysis_prompt},
+                    {"role": "user", "content": user_request}
+                ],
+                temperature=0.3,
+                tools=[_INTENT_TOOL],
+                tool_choice={"type": "function", "function": {"name": "classify_intent"}}
+            )
+            
+            intent_analysis = orjson.loads(intent_response.choices[0].message.tool_calls[0].function.arguments)
+            if request_embedding:
+                intent_cache.store(current_user.id, request_embedding, intent_analysis)
+        logger.debug(f"🤖 AI Intent Analysis: {intent_analysis}")
         
         intent = intent_analysis.get('intent', 'CREATE_TASKS')
         
         if intent == "CREATE_TASKS":
             # Use existing task breakdown logic
-            return await create_new_tasks(user_request, user_context, current_user, db, client)
+            return await create_new_tasks(user_request, user_context, current_user, db, client, background_tasks, current_events)
             
         elif intent == "EDIT_EVENT":
-            return await edit_existing_event(intent_analysis, current_events, current_user, db, user_context)
+            return await edit_existing_event(intent_analysis, current_events, _index_event_text(current_events), current_user, db, user_context)
             
         elif intent == "RESCHEDULE_EVENT":
-            return await reschedule_existing_event(intent_analysis, current_events, current_user, db, user_context)
+            return await reschedule_existing_event(intent_analysis, current_events, _index_event_text(current_events), current_user, db, user_context)
             
         elif intent == "DELETE_EVENT":
-            return await delete_existing_event(intent_analysis, current_events, current_user, db)
+            return await delete_existing_event(intent_analysis, current_events, _index_event_text(current_events), current_user, db)
             
         elif intent == "BULK_DELETE":
             return await bulk_delete_events(intent_analysis, current_events, current_user, db)
@@ -940,14 +1278,56 @@ Return JSON:
         raise HTTPException(status_code=500, detail=f"Failed to process calendar request: {str(e)}")
 
 
-async def create_new_tasks(task_description: str, user_context: str, current_user: User, db: Session, client):
+def _index_event_text(current_events: list) -> list:
+    """
+    Pair each event with its lowercased title + description for keyword matching
+    """
+    return [
+        (event, f"{event.title.lower()}\n{event.description.lower() if event.description else ''}")
+        for event in current_events
+    ]
+
+
+def _best_keyword_match(keywords: list, event_text_index: list):
+    """
+    Return the event matching the most keywords (first one wins ties), or None
+    """
+    weights = Counter(keyword.lower() for keyword in keywords if keyword)
+    if not weights:
+        return None
+    
+    # One scan per event: the lookahead finds the longest keyword starting at each
+    # position, and every shorter keyword starting there is one of its prefixes
+    alternation = "|".join(map(re.escape, sorted(weights, key=len, reverse=True)))
+    matcher = re.compile(f"(?=({alternation}))")
+    prefixes = {
+        keyword: [other for other in weights if keyword.startswith(other)]
+        for keyword in weights
+    }
+    
+    target_event = None
+    best_match_score = 0
+    
+    for event, text in event_text_index:
+        found = set()
+        for match in matcher.finditer(text):
+            found.update(prefixes[match.group(1)])
+        score = sum(weights[keyword] for keyword in found)
+        if score > best_match_score:
+            best_match_score = score
+            target_event = event
+    
+    return target_event
+
+
+async def create_new_tasks(task_description: str, user_context: str, current_user: User, db: Session, client: AsyncOpenAI, background_tasks: BackgroundTasks, current_events: Optional[list] = None):
     """
     Create new tasks using the existing intelligent task breakdown logic
     """
     try:
         # Validate the user context to ensure reasonable scheduling
         if "Sleep: 02:00" in user_context or "sleep_time: 02:00" in user_context:
-            print("⚠️ WARNING: Detected unusual sleep time (02:00), adjusting to reasonable hours")
+            logger.warning("⚠️ WARNING: Detected unusual sleep time (02:00), adjusting to reasonable hours")
             # Fix sleep time to reasonable hour
             user_context = user_context.replace("Sleep: 02:00", "Sleep: 23:00")
             user_context = user_context.replace("sleep_time: 02:00", "Sleep: 23:00")
@@ -957,14 +1337,14 @@ async def create_new_tasks(task_description: str, user_context: str, current_use
             'task_description': task_description,
             'user_context': user_context
         }
-        result = await intelligent_task_breakdown(request_data, current_user, db)
+        result = await _run_task_breakdown(request_data, current_user, db, background_tasks, current_events)
         
         # Validate the result
         if result and result.get('success') and result.get('scheduled_events'):
-            print(f"✅ Successfully created {len(result['scheduled_events'])} tasks")
+            logger.info(f"✅ Successfully created {len(result['scheduled_events'])} tasks")
             return result
         else:
-            print(f"⚠️ Task creation result: {result}")
+            logger.warning(f"⚠️ Task creation result: {result}")
             return {
                 "success": True,  # Override to prevent error display
                 "message": "I've analyzed your request and scheduled some tasks. Please check your calendar!",
@@ -973,10 +1353,9 @@ async def create_new_tasks(task_description: str, user_context: str, current_use
             }
             
     except Exception as e:
-        print(f"❌ Error in create_new_tasks: {str(e)}")
-        print(f"📋 Task description: {task_description}")
-        print(f"🕐 User context: {user_context}")
-        import traceback
+        logger.error(f"❌ Error in create_new_tasks: {str(e)}")
+        logger.error(f"📋 Task description: {task_description}")
+        logger.error(f"🕐 User context: {user_context}")
         traceback.print_exc()
         return {
             "success": False,
@@ -985,7 +1364,7 @@ async def create_new_tasks(task_description: str, user_context: str, current_use
         }
 
 
-async def edit_existing_event(intent_analysis: dict, current_events: list, current_user: User, db: Session, user_context: str):
+async def edit_existing_event(intent_analysis: dict, current_events: list, event_text_index: list, current_user: User, db: Session, user_context: str):
     """
     Edit an existing calendar event based on AI analysis
     """
@@ -998,17 +1377,7 @@ async def edit_existing_event(intent_analysis: dict, current_events: list, curre
         duration_change = extracted_info.get('duration_change')
         
         # Find the most likely target event
-        target_event = None
-        best_match_score = 0
-        
-        for event in current_events:
-            score = 0
-            for keyword in keywords:
-                if keyword.lower() in event.title.lower() or (event.description and keyword.lower() in event.description.lower()):
-                    score += 1
-            if score > best_match_score:
-                best_match_score = score
-                target_event = event
+        target_event = _best_keyword_match(keywords, event_text_index)
         
         if not target_event:
             return {
@@ -1055,11 +1424,8 @@ async def edit_existing_event(intent_analysis: dict, current_events: list, curre
             }
         
         # Apply the updates using the existing smart update logic
-        from app.services.ai_calendar_service import AICalendarService
-        ai_service = AICalendarService()
-        
-        result = await ai_service.update_event_intelligently(
-            target_event.id,
+        result = await ai_calendar_service.update_event_intelligently(
+            target_event,
             current_user.id,
             updates,
             db
@@ -1088,7 +1454,7 @@ async def edit_existing_event(intent_analysis: dict, current_events: list, curre
         }
 
 
-async def reschedule_existing_event(intent_analysis: dict, current_events: list, current_user: User, db: Session, user_context: str):
+async def reschedule_existing_event(intent_analysis: dict, current_events: list, event_text_index: list, current_user: User, db: Session, user_context: str):
     """
     Reschedule an existing event to a better time
     """
@@ -1099,17 +1465,7 @@ async def reschedule_existing_event(intent_analysis: dict, current_events: list,
         target_date = extracted_info.get('target_date')
         
         # Find the target event
-        target_event = None
-        best_match_score = 0
-        
-        for event in current_events:
-            score = 0
-            for keyword in keywords:
-                if keyword.lower() in event.title.lower() or (event.description and keyword.lower() in event.description.lower()):
-                    score += 1
-            if score > best_match_score:
-                best_match_score = score
-                target_event = event
+        target_event = _best_keyword_match(keywords, event_text_index)
         
         if not target_event:
             return {
@@ -1132,9 +1488,6 @@ async def reschedule_existing_event(intent_analysis: dict, current_events: list,
             new_start_time = f"{target_date} {current_time}"
         else:
             # AI should find optimal time
-            from app.services.ai_calendar_service import AICalendarService
-            ai_service = AICalendarService()
-            
             # Get event duration
             duration_minutes = int((target_event.end_time - target_event.start_time).total_seconds() // 60)
             
@@ -1146,7 +1499,7 @@ async def reschedule_existing_event(intent_analysis: dict, current_events: list,
                 'priority': target_event.priority
             }
             
-            optimal_time = await ai_service._find_optimal_time_for_event(
+            optimal_time = await ai_calendar_service._find_optimal_time_for_event(
                 current_user.id, event_data, {'optimal_time_of_day': 'morning'}, db
             )
             
@@ -1162,11 +1515,8 @@ async def reschedule_existing_event(intent_analysis: dict, current_events: list,
         # Update the event
         updates = {'start_time': new_start_time}
         
-        from app.services.ai_calendar_service import AICalendarService
-        ai_service = AICalendarService()
-        
-        result = await ai_service.update_event_intelligently(
-            target_event.id,
+        result = await ai_calendar_service.update_event_intelligently(
+            target_event,
             current_user.id,
             updates,
             db
@@ -1195,7 +1545,7 @@ async def reschedule_existing_event(intent_analysis: dict, current_events: list,
         }
 
 
-async def delete_existing_event(intent_analysis: dict, current_events: list, current_user: User, db: Session):
+async def delete_existing_event(intent_analysis: dict, current_events: list, event_text_index: list, current_user: User, db: Session):
     """
     Delete an existing calendar event
     """
@@ -1204,17 +1554,7 @@ async def delete_existing_event(intent_analysis: dict, current_events: list, cur
         keywords = extracted_info.get('target_event_keywords', [])
         
         # Find the target event
-        target_event = None
-        best_match_score = 0
-        
-        for event in current_events:
-            score = 0
-            for keyword in keywords:
-                if keyword.lower() in event.title.lower() or (event.description and keyword.lower() in event.description.lower()):
-                    score += 1
-            if score > best_match_score:
-                best_match_score = score
-                target_event = event
+        target_event = _best_keyword_match(keywords, event_text_index)
         
         if not target_event:
             return {
@@ -1225,11 +1565,8 @@ async def delete_existing_event(intent_analysis: dict, current_events: list, cur
             }
         
         # Delete the event using the AI service
-        from app.services.ai_calendar_service import AICalendarService
-        ai_service = AICalendarService()
-        
-        result = await ai_service.delete_event_and_reschedule(
-            target_event.id,
+        result = await ai_calendar_service.delete_event_and_reschedule(
+            target_event,
             current_user.id,
             db
         )
@@ -1282,32 +1619,37 @@ async def view_current_schedule(current_events: list, current_user: User, user_c
                 ]
             }
         
-        # Group events by date
-        events_by_date = {}
+        # Group events by date and gather the stats in the same pass
+        events_by_date = defaultdict(list)
+        goal_related_events = 0
+        total_seconds = 0.0
         for event in current_events:
-            date_key = event.start_time.strftime("%Y-%m-%d")
-            if date_key not in events_by_date:
-                events_by_date[date_key] = []
-            events_by_date[date_key].append({
+            start_time = event.start_time
+            end_time = event.end_time
+            duration_seconds = (end_time - start_time).total_seconds()
+            contributes_to_goal = event.contributes_to_goal
+            
+            events_by_date[start_time.strftime("%Y-%m-%d")].append({
                 "id": event.id,
                 "title": event.title,
-                "start_time": event.start_time.strftime("%H:%M"),
-                "end_time": event.end_time.strftime("%H:%M"),
-                "duration_minutes": int((event.end_time - event.start_time).total_seconds() // 60),
+                "start_time": start_time.strftime("%H:%M"),
+                "end_time": end_time.strftime("%H:%M"),
+                "duration_minutes": int(duration_seconds // 60),
                 "event_type": event.event_type.value,
                 "priority": event.priority.value,
-                "goal_related": event.contributes_to_goal
+                "goal_related": contributes_to_goal
             })
+            if contributes_to_goal:
+                goal_related_events += 1
+            total_seconds += duration_seconds
         
-        # Calculate schedule stats
         total_events = len(current_events)
-        goal_related_events = sum(1 for e in current_events if e.contributes_to_goal)
-        total_hours = sum((e.end_time - e.start_time).total_seconds() // 3600 for e in current_events)
+        total_hours = total_seconds / 3600
         
         return {
             "success": True,
             "message": f"Here's your schedule for the next week ({total_events} events, {total_hours:.1f} hours total)",
-            "events_by_date": events_by_date,
+            "events_by_date": dict(events_by_date),
             "statistics": {
                 "total_events": total_events,
                 "goal_related_events": goal_related_events,
@@ -1330,7 +1672,7 @@ async def view_current_schedule(current_events: list, current_user: User, user_c
         }
 
 
-async def optimize_existing_schedule(current_events: list, current_user: User, db: Session, user_context: str, client):
+async def optimize_existing_schedule(current_events: list, current_user: User, db: Session, user_context: str, client: AsyncOpenAI):
     """
     Optimize the user's existing schedule for better productivity
     """
@@ -1348,22 +1690,15 @@ async def optimize_existing_schedule(current_events: list, current_user: User, d
             }
         
         # Analyze current schedule
-        from app.services.ai_calendar_service import AICalendarService
-        ai_service = AICalendarService()
-        
         # Get this week's date range
         today = datetime.now().date()
         monday = today - timedelta(days=today.weekday())
         
-        week_analysis = await ai_service._analyze_weekly_distribution(
+        # The prompt quotes these statistics, so they must be ready before the AI call
+        week_analysis = await ai_calendar_service._analyze_weekly_distribution(
             current_user.id, current_events, [], db
         )
         
-        # Generate optimization suggestions
-        optimizations = await ai_service._generate_weekly_optimizations(
-            current_user.id, current_events, week_analysis, db
-        )
-        
         # Add AI-powered insights about the schedule
         schedule_context = ""
         for event in current_events[:10]:
@@ -1392,17 +1727,23 @@ Provide specific, actionable optimization suggestions in JSON format:
 }}
 """
         
-        ai_response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a productivity expert analyzing calendar schedules."},
-                {"role": "user", "content": optimization_prompt}
-            ],
-            temperature=0.7
+        # Generate optimization suggestions while the AI call is in flight
+        ai_response, optimizations = await asyncio.gather(
+            client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": "You are a productivity expert analyzing calendar schedules."},
+                    {"role": "user", "content": optimization_prompt}
+                ],
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            ),
+            ai_calendar_service._generate_weekly_optimizations(
+                current_user.id, current_events, week_analysis, db
+            )
         )
         
-        import json
-        ai_insights = json.loads(ai_response.choices[0].message.content)
+        ai_insights = _parse_llm_json(ai_response.choices[0].message.content)
         
         return {
             "success": True,
@@ -1427,25 +1768,88 @@ Provide specific, actionable optimization suggestions in JSON format:
 
 
 @router.post("/intelligent-task-breakdown")
-async def intelligent_task_breakdown(request: dict, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def intelligent_task_breakdown(request: dict, background_tasks: BackgroundTasks, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     """
     Break down a complex task into specific, actionable calendar events with intelligent scheduling
     """
+    return await _run_task_breakdown(request, current_user, db, background_tasks)
+
+
+class _BreakdownTask(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    title: str
+    description: str = ""
+    duration_minutes: int = Field(default=60, gt=0)
+
+
+class _TaskBreakdown(BaseModel):
+    model_config = ConfigDict(extra='allow')
+
+    events: List[_BreakdownTask] = Field(min_length=1)
+
+
+# Fast model first; the larger one only sees replies the first got wrong.
+# Only the fast model's reply length is capped, so a breakdown truncated at
+# the cap is retried on the fallback without one
+_TASK_BREAKDOWN_MODELS = (("gpt-4o-mini", {"max_tokens": 1500}), ("gpt-4o", {}))
+
+
+async def _request_task_breakdown(client: AsyncOpenAI, messages: list) -> dict:
+    """
+    Ask the LLM for a task breakdown, falling back to the larger model when the
+    reply is not valid breakdown JSON
+    """
+    for model, limits in _TASK_BREAKDOWN_MODELS:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.4,
+            response_format={"type": "json_object"},
+            **limits
+        )
+        content = response.choices[0].message.content
+        if content is None:
+            # Refusals come back with no content
+            logger.warning(f"⚠️ {model} returned no task breakdown")
+            continue
+        try:
+            breakdown = _parse_llm_json(content)
+            return _TaskBreakdown.model_validate(breakdown).model_dump()
+        except ValueError as e:
+            logger.warning(f"⚠️ {model} returned an invalid task breakdown: {e}")
+    raise ValueError("AI returned an invalid task breakdown")
+
+
+def _insert_planned_events(db: Session, rows: List[Dict[str, Any]]) -> list:
+    """
+    Insert planned events with a single INSERT and commit, returning their ids in order
+    """
+    # The commit leaves the caller's loaded events readable
+    with no_expire_on_commit(db):
+        event_ids = db.scalars(
+            insert(CalendarEvent).returning(CalendarEvent.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+        db.commit()
+    return event_ids
+
+
+async def _run_task_breakdown(request: dict, current_user: User, db: Session, background_tasks: BackgroundTasks, current_events: Optional[list] = None):
+    """
+    Shared body of intelligent_task_breakdown
+
+    current_events, when the caller already loaded the upcoming week, seeds the
+    conflict index instead of querying the calendar again
+    """
     try:
         task_description = request.get('task_description', '')
         user_context = request.get('user_context', '')
         
         # Use AI to analyze and break down the task
-        import openai
-        from app.core.config import settings
-        import os
-        
-        # Get API key same way as in OpenAI service
-        api_key = os.getenv("OPENAI_API_KEY") or settings.openai_api_key
-        if not api_key:
+        client = _get_openai_client()
+        if client is None:
             raise HTTPException(status_code=500, detail="OpenAI API key not configured")
-            
-        client = openai.OpenAI(api_key=api_key)
         
         system_prompt = f"""
 You are an expert productivity consultant and time management specialist. Break down the user's complex goal into 4-8 specific, actionable tasks with realistic time estimates.
@@ -1489,20 +1893,14 @@ Return JSON format:
 }}
 """
         
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Break down this task: {task_description}"}
-            ],
-            temperature=0.7
-        )
-        
-        import json
-        ai_breakdown = json.loads(response.choices[0].message.content)
+        ai_breakdown = await _request_task_breakdown(client, [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"Break down this task: {task_description}"}
+        ])
         
         # Create comprehensive routine blocks to avoid
         routine_blocks = create_routine_blocks(user_context, datetime.now().date())
+        routine_index = RoutineIndex(routine_blocks)
         
         # Schedule each event using STRICT sequential scheduling
         scheduled_events = []
@@ -1513,16 +1911,16 @@ Return JSON format:
         tomorrow = today + timedelta(days=1)
         
         # First try to schedule for today
-        current_scheduling_time = find_next_work_slot(now, routine_blocks, user_context)
+        current_scheduling_time = find_next_work_slot(now, routine_index, user_context)
         
         # If scheduling starts beyond tomorrow, try to find slots today first
         if current_scheduling_time.date() > tomorrow:
-            print(f"⚠️ Initial scheduling too far ahead ({current_scheduling_time.date()}), trying today first...")
+            logger.warning(f"⚠️ Initial scheduling too far ahead ({current_scheduling_time.date()}), trying today first...")
             
             # Try different times today to find available slots
-            work_match = re.search(r'[Ww]ork[^:]*:\s*(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})', user_context)
+            work_match = _WORK_HOURS_RE.search(user_context)
             if work_match:
-                work_end_time = datetime.strptime(work_match.group(2), '%H:%M').time()
+                work_end_time = _parse_hhmm(work_match.group(2))
             else:
                 work_end_time = time(19, 0)  # Default 7 PM
             
@@ -1531,15 +1929,15 @@ Return JSON format:
                 if start_hour < work_end_time.hour and start_hour > now.hour:
                     test_time = datetime.combine(today, time(max(11, start_hour), 0))
                     if test_time > now:
-                        current_scheduling_time = find_next_work_slot(test_time, routine_blocks, user_context)
+                        current_scheduling_time = find_next_work_slot(test_time, routine_index, user_context)
                         if current_scheduling_time.date() <= tomorrow:
                             break
         
-        print(f"🚀 Starting sequential scheduling from: {current_scheduling_time.strftime('%Y-%m-%d %H:%M')}")
+        logger.debug(f"🚀 Starting sequential scheduling from: {current_scheduling_time.strftime('%Y-%m-%d %H:%M')}")
         
         # Safety check - don't schedule beyond tomorrow
         if current_scheduling_time.date() > tomorrow:
-            print(f"❌ SCHEDULING ERROR: Cannot schedule beyond tomorrow. Current start time: {current_scheduling_time.date()}")
+            logger.error(f"❌ SCHEDULING ERROR: Cannot schedule beyond tomorrow. Current start time: {current_scheduling_time.date()}")
             return {
                 "success": False,
                 "error": "No available time slots in next 2 days",
@@ -1547,107 +1945,65 @@ Return JSON format:
                 "suggestion": "Try clearing some existing events or adjusting your work hours to create more availability."
             }
         
+        # Load the scheduling window once; placed tasks are added as we go
+        if current_events is not None:
+            event_index = EventIndex(current_events)
+        else:
+            event_index = await asyncio.to_thread(
+                EventIndex.load,
+                db,
+                current_user.id,
+                datetime.combine(today, time(0, 0)),
+                datetime.combine(tomorrow + timedelta(days=1), time(23, 59, 59))
+            )
+        
+        # Plan every task first, then write them with a single INSERT
+        pending_rows = []
         for idx, event_data in enumerate(ai_breakdown['events']):
             # Map event type to proper enum
-            from app.models.calendar import EventType, EventPriority
-            
             event_type_str = event_data.get('event_type', 'task')
-            event_type_mapping = {
-                'task': EventType.TASK,
-                'meeting': EventType.MEETING,
-                'focus': EventType.DEEP_WORK,
-                'research': EventType.LEARNING,
-                'creative': EventType.TASK,
-                'outreach': EventType.NETWORKING,
-                'planning': EventType.PLANNING
-            }
-            event_type = event_type_mapping.get(event_type_str, EventType.TASK)
+            event_type = _EVENT_TYPE_MAP.get(event_type_str, EventType.TASK)
             
             priority_str = event_data.get('priority', 'medium')
-            priority_mapping = {
-                'low': EventPriority.LOW,
-                'medium': EventPriority.MEDIUM,
-                'high': EventPriority.HIGH,
-                'urgent': EventPriority.URGENT
-            }
-            priority = priority_mapping.get(priority_str, EventPriority.MEDIUM)
+            priority = _PRIORITY_MAP.get(priority_str, EventPriority.MEDIUM)
             
             # Schedule this specific task
             duration_minutes = event_data.get('duration_minutes', 60)
             
+            # Pure in-memory work against the indexes, cheaper than a thread hop
             actual_start_time = schedule_task_sequentially(
                 current_scheduling_time,
                 duration_minutes,
-                routine_blocks,
+                routine_index,
                 user_context,
-                db,
-                current_user.id
+                event_index
             )
             
             # Check if the task was scheduled beyond tomorrow
             if actual_start_time.date() > tomorrow:
-                print(f"⚠️ WARNING: Task '{event_data['title']}' would be scheduled on {actual_start_time.date()}, skipping to stay within today/tomorrow limit")
+                logger.warning(f"⚠️ WARNING: Task '{event_data['title']}' would be scheduled on {actual_start_time.date()}, skipping to stay within today/tomorrow limit")
                 break  # Stop scheduling more tasks
             
             actual_end_time = actual_start_time + timedelta(minutes=duration_minutes)
             
-            print(f"📅 Task {idx+1}: '{event_data['title']}' scheduled for {actual_start_time.strftime('%H:%M')} - {actual_end_time.strftime('%H:%M')}")
-            
-            # Create the calendar event
-            from app.models.calendar import CalendarEvent
-            
-            calendar_event = CalendarEvent(
-                user_id=current_user.id,
-                title=event_data['title'],
-                description=event_data['description'],
-                event_type=event_type,
-                start_time=actual_start_time,
-                end_time=actual_end_time,
-                priority=priority,
-                contributes_to_goal=True,
-                auto_scheduled=True,
-                scheduling_type=SchedulingType.AI_SCHEDULED
-            )
-            
-            db.add(calendar_event)
-            db.commit()
-            db.refresh(calendar_event)
+            logger.debug(f"📅 Task {idx+1}: '{event_data['title']}' scheduled for {actual_start_time.strftime('%H:%M')} - {actual_end_time.strftime('%H:%M')}")
             
-            # Sync to Google Calendar
-            google_synced = False
-            google_event_url = None
-            try:
-                from app.services.google_calendar_service import GoogleCalendarService
-                google_service = GoogleCalendarService()
-                
-                if google_service.is_calendar_connected(current_user.id):
-                    google_result = google_service.create_calendar_event(
-                        current_user.id,
-                        {
-                            'title': event_data['title'],
-                            'description': f"{event_data['description']}\n\n🤖 AI-scheduled for optimal productivity\n🎯 Intelligent task breakdown",
-                            'start_time': actual_start_time,
-                            'end_time': actual_end_time
-                        }
-                    )
-                    
-                    if google_result['success']:
-                        calendar_event.google_event_id = google_result['event_id']
-                        calendar_event.is_synced = True
-                        calendar_event.sync_status = "synced"
-                        google_synced = True
-                        google_event_url = google_result.get('event_url')
-                        db.commit()
-                        print(f"✅ Synced '{event_data['title']}' to Google Calendar")
-                    else:
-                        print(f"⚠️ Failed to sync '{event_data['title']}' to Google Calendar: {google_result.get('error', 'Unknown error')}")
-                        
-            except Exception as sync_error:
-                print(f"❌ Google Calendar sync failed for '{event_data['title']}': {sync_error}")
-                # Don't fail the entire operation if sync fails
+            pending_rows.append({
+                'user_id': current_user.id,
+                'title': event_data['title'],
+                'description': event_data['description'],
+                'event_type': event_type,
+                'start_time': actual_start_time,
+                'end_time': actual_end_time,
+                'priority': priority,
+                'contributes_to_goal': True,
+                'auto_scheduled': True,
+                'scheduling_type': SchedulingType.AI_SCHEDULED
+            })
+            event_index.insert(actual_start_time, actual_end_time, event_data['title'])
             
             scheduled_events.append({
-                'event_id': calendar_event.id,
+                'event_id': None,
                 'title': event_data['title'],
                 'start_time': actual_start_time.isoformat(),
                 'end_time': actual_end_time.isoformat(),
@@ -1655,13 +2011,35 @@ Return JSON format:
                 'description': event_data['description'],
                 'priority': priority_str,
                 'event_type': event_type_str,
-                'google_synced': google_synced,
-                'google_event_url': google_event_url
+                'google_synced': "pending",
+                'google_event_url': None
             })
             
             # Update scheduling time for next event (add 15-minute buffer)
             current_scheduling_time = actual_end_time + timedelta(minutes=15)
         
+        if pending_rows:
+            event_ids = await asyncio.to_thread(_insert_planned_events, db, pending_rows)
+            
+            for event_id, scheduled in zip(event_ids, scheduled_events):
+                scheduled['event_id'] = event_id
+            
+            # Sync to Google Calendar after the response is sent
+            background_tasks.add_task(
+                _sync_events_to_google,
+                current_user.id,
+                event_ids,
+                [
+                    {
+                        'title': row['title'],
+                        'description': f"{row['description']}\n\n🤖 AI-scheduled for optimal productivity\n🎯 Intelligent task breakdown",
+                        'start_time': row['start_time'],
+                        'end_time': row['end_time']
+                    }
+                    for row in pending_rows
+                ]
+            )
+        
         # Return comprehensive response
         return {
             "success": True,
@@ -1697,16 +2075,14 @@ async def bulk_modify_event_durations(intent_analysis: dict, current_events: lis
                 "modified_events": 0
             }
         
-        # Modify each event's duration
+        # Build the response from the loaded events, then move every end time in one UPDATE
+        delta = timedelta(minutes=target_duration)
         modified_events = []
         
         for event in current_events:
-            # Calculate old and new durations
-            from datetime import timedelta
             old_duration = int((event.end_time - event.start_time).total_seconds() / 60)
-            new_end_time = event.start_time + timedelta(minutes=target_duration)
+            new_end_time = event.start_time + delta
             
-            # Store info before updating
             modified_events.append({
                 "id": event.id,
                 "title": event.title,
@@ -1715,11 +2091,21 @@ async def bulk_modify_event_durations(intent_analysis: dict, current_events: lis
                 "start_time": event.start_time.strftime("%Y-%m-%d %H:%M"),
                 "end_time": new_end_time.strftime("%Y-%m-%d %H:%M")
             })
-            
-            # Update the event in the database
-            event.end_time = new_end_time
         
-        # Commit all changes to database
+        event_ids = [event["id"] for event in modified_events]
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(
+                update(CalendarEvent)
+                .where(CalendarEvent.user_id == current_user.id, CalendarEvent.id.in_(event_ids))
+                .values(end_time=CalendarEvent.start_time + delta)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            # SQLite has no interval arithmetic, so send the computed end times instead
+            db.execute(
+                update(CalendarEvent),
+                [{"id": event.id, "end_time": event.start_time + delta} for event in current_events]
+            )
         db.commit()
         
         return {
@@ -1739,6 +2125,37 @@ async def bulk_modify_event_durations(intent_analysis: dict, current_events: lis
         }
 
 
+# Columns read by the priority matrix
+_PRIORITY_MATRIX_COLUMNS = (
+    CalendarEvent.id,
+    CalendarEvent.title,
+    CalendarEvent.description,
+    CalendarEvent.start_time,
+    CalendarEvent.end_time,
+    CalendarEvent.eisenhower_quadrant,
+    CalendarEvent.is_urgent,
+    CalendarEvent.is_important,
+    CalendarEvent.urgency_reason,
+    CalendarEvent.importance_reason,
+    CalendarEvent.contributes_to_goal
+)
+
+
+def _duration_minutes(dialect_name: str):
+    """
+    Whole minutes between an event's start and end, computed by the database
+    """
+    if dialect_name == "postgresql":
+        minutes = func.extract('epoch', CalendarEvent.end_time - CalendarEvent.start_time) // 60
+    else:
+        # SQLite has no interval type; unix seconds subtract exactly
+        minutes = (
+            func.strftime('%s', CalendarEvent.end_time, type_=Integer)
+            - func.strftime('%s', CalendarEvent.start_time, type_=Integer)
+        ) // 60
+    return cast(minutes, Integer)
+
+
 @router.get("/priority-matrix")
 async def get_priority_matrix(
     days_ahead: int = 7,
@@ -1749,17 +2166,20 @@ async def get_priority_matrix(
     Get Eisenhower Matrix visualization of calendar events
     """
     try:
-        from datetime import datetime, timedelta
-        from app.models.calendar import CalendarEvent, EisenhowerQuadrant
-        
         # Get events for the specified period
         start_date = datetime.utcnow()
         end_date = start_date + timedelta(days=days_ahead)
         
-        events = db.query(CalendarEvent).filter(
-            CalendarEvent.user_id == current_user.id,
-            CalendarEvent.start_time >= start_date,
-            CalendarEvent.start_time <= end_date
+        # Only the columns the matrix shows, as plain rows rather than ORM objects
+        events = db.execute(
+            select(
+                *_PRIORITY_MATRIX_COLUMNS,
+                _duration_minutes(db.get_bind().dialect.name).label('duration_minutes')
+            ).where(
+                CalendarEvent.user_id == current_user.id,
+                CalendarEvent.start_time >= start_date,
+                CalendarEvent.start_time <= end_date
+            )
         ).all()
         
         # Classify events by Eisenhower quadrant
@@ -1770,11 +2190,10 @@ async def get_priority_matrix(
             'q4_not_urgent_not_important': []
         }
         
-        unclassified_events = []
         total_time_by_quadrant = {q: 0 for q in quadrants.keys()}
         
         for event in events:
-            duration_minutes = int((event.end_time - event.start_time).total_seconds() / 60)
+            duration_minutes = event.duration_minutes
             
             event_data = {
                 'id': event.id,
@@ -1792,24 +2211,18 @@ async def get_priority_matrix(
             
             if event.eisenhower_quadrant:
                 quadrant = event.eisenhower_quadrant.value
-                quadrants[quadrant].append(event_data)
-                total_time_by_quadrant[quadrant] += duration_minutes
+            # Auto-classify if not classified
+            elif event.is_urgent and event.is_important:
+                quadrant = 'q1_urgent_important'
+            elif not event.is_urgent and event.is_important:
+                quadrant = 'q2_not_urgent_important'
+            elif event.is_urgent and not event.is_important:
+                quadrant = 'q3_urgent_not_important'
             else:
-                # Auto-classify if not classified
-                if hasattr(event, 'is_urgent') and hasattr(event, 'is_important'):
-                    if event.is_urgent and event.is_important:
-                        quadrant = 'q1_urgent_important'
-                    elif not event.is_urgent and event.is_important:
-                        quadrant = 'q2_not_urgent_important'
-                    elif event.is_urgent and not event.is_important:
-                        quadrant = 'q3_urgent_not_important'
-                    else:
-                        quadrant = 'q4_not_urgent_not_important'
-                    
-                    quadrants[quadrant].append(event_data)
-                    total_time_by_quadrant[quadrant] += duration_minutes
-                else:
-                    unclassified_events.append(event_data)
+                quadrant = 'q4_not_urgent_not_important'
+            
+            quadrants[quadrant].append(event_data)
+            total_time_by_quadrant[quadrant] += duration_minutes
         
         # Calculate percentages
         total_time = sum(total_time_by_quadrant.values())
@@ -1907,7 +2320,7 @@ async def get_priority_matrix(
                 'total_time_hours': round(total_time / 60, 1),
                 'productivity_score': productivity_score,
                 'productivity_rating': 'Excellent' if productivity_score >= 70 else 'Good' if productivity_score >= 50 else 'Needs Improvement',
-                'unclassified_events': len(unclassified_events)
+                'unclassified_events': 0  # Events without a quadrant fall back to their urgent/important flags
             },
             'insights': insights,
             'recommendations': recommendations,
@@ -1932,14 +2345,21 @@ async def optimize_calendar_by_priority(
     Optimize calendar schedule based on Eisenhower Matrix priorities
     """
     try:
-        from datetime import datetime, timedelta
-        from app.models.calendar import CalendarEvent
-        
         # Get next 14 days of events
         start_date = datetime.utcnow()
         end_date = start_date + timedelta(days=14)
         
-        events = db.query(CalendarEvent).filter(
+        # Only the columns classification and the suggestions read
+        events = db.query(CalendarEvent).options(
+            load_only(
+                CalendarEvent.id,
+                CalendarEvent.title,
+                CalendarEvent.description,
+                CalendarEvent.start_time,
+                CalendarEvent.eisenhower_quadrant,
+                CalendarEvent.contributes_to_goal
+            )
+        ).filter(
             CalendarEvent.user_id == current_user.id,
             CalendarEvent.start_time >= start_date,
             CalendarEvent.start_time <= end_date
@@ -1952,101 +2372,105 @@ async def optimize_calendar_by_priority(
                 'optimizations': []
             }
         
-        # Classify unclassified events
-        ai_service = ai_calendar_service
+        # Classify unclassified events with a single AI call
         optimizations = []
+        unclassified = [event for event in events if not event.eisenhower_quadrant]
         
-        for event in events:
-            # Skip if already classified
-            if event.eisenhower_quadrant:
-                continue
+        if unclassified:
+            user_context = await ai_calendar_service._get_user_context(current_user.id, db)
+            classification_results = await ai_calendar_service.classify_eisenhower_matrix_batch(
+                [
+                    {
+                        'title': event.title,
+                        'description': event.description or '',
+                        'goal_related': event.contributes_to_goal
+                    }
+                    for event in unclassified
+                ],
+                user_context
+            )
+            
+            classification_updates = []
+            for event, classification_result in zip(unclassified, classification_results):
+                classification = classification_result['classification']
+                quadrant = EisenhowerQuadrant(classification['quadrant'])
                 
-            try:
-                # Get user context and classify
-                user_context = await ai_service._get_user_context(current_user.id, db)
-                classification_result = await ai_service.classify_eisenhower_matrix(
-                    event_title=event.title,
-                    event_description=event.description or '',
-                    user_context=user_context,
-                    goal_related=event.contributes_to_goal
-                )
+                classification_updates.append({
+                    'id': event.id,
+                    'eisenhower_quadrant': quadrant,
+                    'is_urgent': classification.get('is_urgent', False),
+                    'is_important': classification.get('is_important', True),
+                    'urgency_reason': classification.get('urgency_reason'),
+                    'importance_reason': classification.get('importance_reason')
+                })
                 
-                if classification_result.get('success'):
-                    classification = classification_result['classification']
-                    
-                    # Update event with classification
-                    event.eisenhower_quadrant = classification.get('quadrant')
-                    event.is_urgent = classification.get('is_urgent', False)
-                    event.is_important = classification.get('is_important', True)
-                    event.urgency_reason = classification.get('urgency_reason')
-                    event.importance_reason = classification.get('importance_reason')
-                    
-                    optimizations.append({
-                        'event_id': event.id,
-                        'title': event.title,
-                        'old_classification': 'unclassified',
-                        'new_quadrant': classification.get('quadrant'),
-                        'scheduling_recommendation': classification.get('scheduling_recommendation'),
-                        'confidence': classification.get('confidence', 0.7)
-                    })
-                    
-            except Exception as e:
-                print(f"Error classifying event {event.title}: {e}")
-                continue
+                optimizations.append({
+                    'event_id': event.id,
+                    'title': event.title,
+                    'old_classification': 'unclassified',
+                    'new_quadrant': quadrant.value,
+                    'scheduling_recommendation': classification.get('scheduling_recommendation'),
+                    'confidence': classification.get('confidence', 0.7)
+                })
+            
+            # Write every classification in one executemany UPDATE
+            db.execute(update(CalendarEvent), classification_updates)
+            
+            # The bulk UPDATE leaves loaded objects alone; mirror the new quadrant for bucketing below
+            for event, classification_update in zip(unclassified, classification_updates):
+                set_committed_value(event, 'eisenhower_quadrant', classification_update['eisenhower_quadrant'])
         
         # Apply priority-based rescheduling
         rescheduling_changes = []
         
-        # Get Q1 events (urgent + important) - should be scheduled ASAP
-        q1_events = [e for e in events if getattr(e, 'eisenhower_quadrant', None) == 'q1_urgent_important']
-        
-        # Get Q2 events (not urgent + important) - should get prime time slots
-        q2_events = [e for e in events if getattr(e, 'eisenhower_quadrant', None) == 'q2_not_urgent_important']
+        # Bucket events by quadrant and check each one's timing in a single pass
+        today = datetime.utcnow().date()
+        quadrant_counts = Counter()
+        urgent_suggestions = []
+        timing_suggestions = []
+        delegate_suggestions = []
         
-        # Get Q3 events (urgent + not important) - can be moved to less optimal times
-        q3_events = [e for e in events if getattr(e, 'eisenhower_quadrant', None) == 'q3_urgent_not_important']
-        
-        # Priority-based rescheduling suggestions
-        suggestions = []
-        
-        # Check for Q1 events scheduled too far out
-        for event in q1_events:
-            days_until = (event.start_time.date() - datetime.utcnow().date()).days
-            if days_until > 2:
-                suggestions.append({
-                    'type': 'reschedule_urgent',
-                    'event_id': event.id,
-                    'title': event.title,
-                    'current_time': event.start_time.isoformat(),
-                    'recommendation': 'Move to within next 2 days - this is urgent!',
-                    'priority': 'high'
-                })
-        
-        # Check for Q2 events in poor time slots (late evening, very early morning)
-        for event in q2_events:
-            hour = event.start_time.hour
-            if hour < 6 or hour > 20:  # Outside prime working hours
-                suggestions.append({
-                    'type': 'improve_timing',
-                    'event_id': event.id,
-                    'title': event.title,
-                    'current_time': event.start_time.isoformat(),
-                    'recommendation': 'Move to prime time (8 AM - 6 PM) for better focus',
-                    'priority': 'medium'
-                })
+        for event in events:
+            quadrant = event.eisenhower_quadrant
+            quadrant_counts[quadrant] += 1
+            
+            if quadrant == EisenhowerQuadrant.Q1_URGENT_IMPORTANT:
+                # Q1 (urgent + important) should be scheduled ASAP
+                if (event.start_time.date() - today).days > 2:
+                    urgent_suggestions.append({
+                        'type': 'reschedule_urgent',
+                        'event_id': event.id,
+                        'title': event.title,
+                        'current_time': event.start_time.isoformat(),
+                        'recommendation': 'Move to within next 2 days - this is urgent!',
+                        'priority': 'high'
+                    })
+            elif quadrant == EisenhowerQuadrant.Q2_NOT_URGENT_IMPORTANT:
+                # Q2 (not urgent + important) should get prime time, not late evening or very early morning
+                hour = event.start_time.hour
+                if hour < 6 or hour > 20:
+                    timing_suggestions.append({
+                        'type': 'improve_timing',
+                        'event_id': event.id,
+                        'title': event.title,
+                        'current_time': event.start_time.isoformat(),
+                        'recommendation': 'Move to prime time (8 AM - 6 PM) for better focus',
+                        'priority': 'medium'
+                    })
+            elif quadrant == EisenhowerQuadrant.Q3_URGENT_NOT_IMPORTANT:
+                # Q3 (urgent + not important) shouldn't take up prime morning hours
+                if 9 <= event.start_time.hour <= 12:
+                    delegate_suggestions.append({
+                        'type': 'delegate_or_move',
+                        'event_id': event.id,
+                        'title': event.title,
+                        'current_time': event.start_time.isoformat(),
+                        'recommendation': 'Consider delegating or moving to afternoon - this takes prime focus time',
+                        'priority': 'medium'
+                    })
         
-        # Check for Q3 events taking up prime time
-        for event in q3_events:
-            hour = event.start_time.hour
-            if 9 <= hour <= 12:  # Prime morning hours
-                suggestions.append({
-                    'type': 'delegate_or_move',
-                    'event_id': event.id,
-                    'title': event.title,
-                    'current_time': event.start_time.isoformat(),
-                    'recommendation': 'Consider delegating or moving to afternoon - this takes prime focus time',
-                    'priority': 'medium'
-                })
+        # Priority-based rescheduling suggestions, most urgent kind first
+        suggestions = urgent_suggestions + timing_suggestions + delegate_suggestions
         
         # Commit classification changes
         db.commit()
@@ -2064,9 +2488,9 @@ async def optimize_calendar_by_priority(
                 'events_classified': total_events_classified,
                 'high_priority_suggestions': high_priority_suggestions,
                 'total_suggestions': len(suggestions),
-                'q1_events': len(q1_events),
-                'q2_events': len(q2_events),
-                'q3_events': len(q3_events)
+                'q1_events': quadrant_counts[EisenhowerQuadrant.Q1_URGENT_IMPORTANT],
+                'q2_events': quadrant_counts[EisenhowerQuadrant.Q2_NOT_URGENT_IMPORTANT],
+                'q3_events': quadrant_counts[EisenhowerQuadrant.Q3_URGENT_NOT_IMPORTANT]
             },
             'next_steps': [
                 'Review Q1 (urgent) events - handle these first',
@@ -2080,32 +2504,51 @@ async def optimize_calendar_by_priority(
         raise HTTPException(status_code=500, detail=f"Failed to optimize calendar: {str(e)}")
 
 
+# Reschedules already running, keyed by (user_id, event_id, new start). A repeat
+# request for the same move awaits the running one instead of repeating the LLM work
+_inflight_reschedules: Dict[tuple, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+async def _run_smart_reschedule(event_id: int, new_start_time: datetime, user_id: int) -> Dict[str, Any]:
+    """Shared reschedule task; uses its own session since it can outlive the request that started it"""
+    db = SessionLocal()
+    try:
+        return await ai_calendar_service.smart_reschedule_dependent_events(
+            moved_event_id=event_id,
+            new_start_time=new_start_time,
+            user_id=user_id,
+            db=db
+        )
+    finally:
+        db.close()
+
+
 @router.post("/smart-reschedule/{event_id}")
 async def smart_reschedule_event(
     event_id: int,
     new_start_time: str,  # ISO format datetime
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Smart reschedule an event and auto-adjust dependent tasks
     """
     try:
-        from datetime import datetime
-        
         # Parse the new start time
         try:
-            new_start_dt = datetime.fromisoformat(new_start_time.replace('Z', '+00:00'))
+            new_start_dt = datetime.fromisoformat(new_start_time)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid datetime format. Use ISO format.")
         
         # Use the AI service to handle smart rescheduling
-        result = await ai_calendar_service.smart_reschedule_dependent_events(
-            moved_event_id=event_id,
-            new_start_time=new_start_dt,
-            user_id=current_user.id,
-            db=db
-        )
+        key = (current_user.id, event_id, new_start_dt.isoformat())
+        task = _inflight_reschedules.get(key)
+        if task is None:
+            task = asyncio.create_task(_run_smart_reschedule(event_id, new_start_dt, current_user.id))
+            _inflight_reschedules[key] = task
+            task.add_done_callback(lambda _: _inflight_reschedules.pop(key, None))
+        # Shielded so a cancelled request (e.g. client disconnect) doesn't cancel
+        # the reschedule for the other requests awaiting it
+        result = await asyncio.shield(task)
         
         if result['success']:
             return {
@@ -2131,19 +2574,43 @@ async def smart_reschedule_event(
 async def detect_event_dependencies(
     event_title: str,
     event_description: str = "",
+    before_start_time: Optional[str] = None,  # ISO format datetime
+    before_id: Optional[int] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Detect potential dependencies between events using AI
+
+    before_start_time and before_id page back through older events: pass the
+    start_time and id of the oldest event already considered. before_id is only
+    a tie-breaker, so it requires before_start_time.
     """
+    if before_id is not None and not before_start_time:
+        raise HTTPException(status_code=400, detail="before_id requires before_start_time")
+    
     try:
-        from app.models.calendar import CalendarEvent
+        # Get existing events for analysis, newest first; id breaks start_time ties.
+        # Only the columns the prompt lists are loaded, as plain rows
+        query = db.query(
+            CalendarEvent.id, CalendarEvent.title, CalendarEvent.start_time
+        ).filter(CalendarEvent.user_id == current_user.id)
         
-        # Get existing events for analysis
-        existing_events = db.query(CalendarEvent).filter(
-            CalendarEvent.user_id == current_user.id
-        ).order_by(CalendarEvent.start_time.desc()).limit(20).all()
+        if before_start_time:
+            try:
+                cursor_start = datetime.fromisoformat(before_start_time)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid datetime format. Use ISO format.")
+            
+            # Keyset cursor rather than OFFSET, so deeper pages stay index range scans
+            if before_id is not None:
+                query = query.filter(tuple_(CalendarEvent.start_time, CalendarEvent.id) < (cursor_start, before_id))
+            else:
+                query = query.filter(CalendarEvent.start_time < cursor_start)
+        
+        existing_events = query.order_by(
+            CalendarEvent.start_time.desc(), CalendarEvent.id.desc()
+        ).limit(20).all()
         
         # Use AI service to detect dependencies
         result = await ai_calendar_service.detect_event_dependencies(
@@ -2169,19 +2636,21 @@ async def detect_event_dependencies(
                 'message': 'Dependency detection failed'
             }
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Dependency detection failed: {str(e)}")
 
 
-@router.post("/debug/test-task-creation")
+@debug_router.post("/debug/test-task-creation")
 async def debug_test_task_creation(
     request: dict,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """Debug endpoint to test task creation - Uses test user"""
     try:
         # Get test user (User ID 4)
-        from app.models import User
         test_user = db.query(User).filter(User.id == 4).first()
         
         if not test_user:
@@ -2195,9 +2664,9 @@ async def debug_test_task_creation(
         user_context = request.get('user_context', 'Work: 09:00-18:00, Gym: 06:00, Lunch: 12:00, Sleep: 23:00')
         
         # Creating tasks from AI analysis
-        print(f"  Task: {task_description}")
-        print(f"  User: {test_user.username} (ID: {test_user.id})")
-        print(f"  Context: {user_context}")
+        logger.info(f"  Task: {task_description}")
+        logger.info(f"  User: {test_user.username} (ID: {test_user.id})")
+        logger.info(f"  Context: {user_context}")
         
         # Test the intelligent task breakdown directly
         request_data = {
@@ -2205,7 +2674,7 @@ async def debug_test_task_creation(
             'user_context': user_context
         }
         
-        result = await intelligent_task_breakdown(request_data, test_user, db)
+        result = await _run_task_breakdown(request_data, test_user, db, background_tasks)
         
         return {
             "success": True,
@@ -2219,10 +2688,9 @@ async def debug_test_task_creation(
         }
         
     except Exception as e:
-        import traceback
         error_details = traceback.format_exc()
-        print(f"❌ Debug task creation error: {e}")
-        print(f"Full traceback: {error_details}")
+        logger.error(f"❌ Debug task creation error: {e}")
+        logger.error(f"Full traceback: {error_details}")
         
         return {
             "success": False,
@@ -2232,7 +2700,7 @@ async def debug_test_task_creation(
         }
 
 
-@router.get("/debug/auth-status")
+@debug_router.get("/debug/auth-status")
 async def debug_auth_status():
     """Debug endpoint to check API availability - NO AUTH REQUIRED"""
     return {
@@ -2248,7 +2716,7 @@ async def debug_auth_status():
     }
 
 
-@router.post("/debug/simple-assistant")
+@debug_router.post("/debug/simple-assistant")
 async def debug_simple_assistant(
     request: dict,
     db: Session = Depends(get_db)
@@ -2256,7 +2724,6 @@ async def debug_simple_assistant(
     """Simplified AI assistant for debugging - Uses test user if no auth"""
     try:
         # Try to get test user (User ID 4 from previous session)
-        from app.models import User
         test_user = db.query(User).filter(User.id == 4).first()
         
         if not test_user:
@@ -2292,32 +2759,53 @@ async def debug_simple_assistant(
         }
 
 
+# Keywords that turn a bulk delete into clearing the whole calendar
+_DELETE_ALL_KEYWORDS = frozenset({'all', 'everything', 'clear', 'every'})
+
+# Deleted events echoed back for confirmation
+_DELETED_EVENTS_SHOWN = 5
+
+
 async def bulk_delete_events(intent_analysis: dict, current_events: list, current_user: User, db: Session):
     """
     Delete multiple or all calendar events based on user request
     """
     try:
         extracted_info = intent_analysis.get('extracted_info', {})
-        keywords = extracted_info.get('target_event_keywords', [])
+        keywords = [keyword.lower() for keyword in extracted_info.get('target_event_keywords', [])]
         
         # Determine scope of deletion
-        delete_all = False
-        if any(keyword.lower() in ['all', 'everything', 'clear', 'every'] for keyword in keywords):
-            delete_all = True
+        delete_all = not _DELETE_ALL_KEYWORDS.isdisjoint(keywords)
+        
+        # Filter events based on keywords with one scan per event; the NUL
+        # separator keeps a keyword from matching across title and description
+        pattern = re.compile("|".join(map(re.escape, keywords))) if keywords and not delete_all else None
         
+        # Pick the events and capture everything the response needs before the
+        # rows are gone, in one pass
         events_to_delete = []
+        deleted_events_info = []
+        google_titles = {}
+        total_freed_minutes = 0
         
-        if delete_all:
-            # Delete all events
-            events_to_delete = current_events.copy()
-        else:
-            # Filter events based on keywords
+        if delete_all or pattern:
             for event in current_events:
-                for keyword in keywords:
-                    if (keyword.lower() in event.title.lower() or 
-                        (event.description and keyword.lower() in event.description.lower())):
-                        events_to_delete.append(event)
-                        break
+                if pattern and not pattern.search(f"{event.title}\x00{event.description or ''}".lower()):
+                    continue
+                
+                events_to_delete.append(event)
+                if len(deleted_events_info) < _DELETED_EVENTS_SHOWN:
+                    deleted_events_info.append({
+                        "id": event.id,
+                        "title": event.title,
+                        "start_time": event.start_time.strftime("%Y-%m-%d %H:%M"),
+                        "end_time": event.end_time.strftime("%Y-%m-%d %H:%M"),
+                        "google_event_id": event.google_event_id
+                    })
+                if event.google_event_id:
+                    google_titles[event.google_event_id] = event.title
+                if not delete_all:
+                    total_freed_minutes += int((event.end_time - event.start_time).total_seconds() / 60)
         
         if not events_to_delete:
             return {
@@ -2326,66 +2814,53 @@ async def bulk_delete_events(intent_analysis: dict, current_events: list, curren
                 "events_found": 0
             }
         
-        # Store info about events before deletion
-        deleted_events_info = []
         google_sync_errors = []
         
-        for event in events_to_delete:
-            deleted_events_info.append({
-                "id": event.id,
-                "title": event.title,
-                "start_time": event.start_time.strftime("%Y-%m-%d %H:%M"),
-                "end_time": event.end_time.strftime("%Y-%m-%d %H:%M"),
-                "google_event_id": event.google_event_id
-            })
-            
-            # Delete from Google Calendar if synced
-            if event.google_event_id:
-                try:
-                    from app.services.google_calendar_service import GoogleCalendarService
-                    google_service = GoogleCalendarService()
-                    
-                    if google_service.is_calendar_connected(current_user.id):
-                        from googleapiclient.discovery import build
-                        credentials = google_service.get_user_credentials(current_user.id)
-                        if credentials:
-                            service = build('calendar', 'v3', credentials=credentials)
-                            service.events().delete(
-                                calendarId='primary',
-                                eventId=event.google_event_id
-                            ).execute()
-                            print(f"✅ Deleted from Google Calendar: {event.title}")
-                except Exception as google_error:
-                    google_sync_errors.append(f"Failed to delete '{event.title}' from Google Calendar: {str(google_error)}")
-                    print(f"❌ Google Calendar delete failed for {event.title}: {google_error}")
-            
-            # Delete from local database
-            db.delete(event)
-        
-        # Commit all deletions
-        db.commit()
-        
-        # Calculate freed time
-        total_freed_minutes = sum(
-            int((event.end_time - event.start_time).total_seconds() / 60) 
-            for event in events_to_delete
+        # Delete from Google Calendar in batched requests; googleapiclient is
+        # synchronous, so the round-trips run in a worker thread
+        if google_titles:
+            google_result = await asyncio.to_thread(
+                google_calendar_service.batch_delete_events, current_user.id, list(google_titles)
+            )
+            for google_event_id in google_result['deleted']:
+                logger.info(f"✅ Deleted from Google Calendar: {google_titles[google_event_id]}")
+            for google_event_id, google_error in google_result['errors'].items():
+                title = google_titles[google_event_id]
+                google_sync_errors.append(f"Failed to delete '{title}' from Google Calendar: {google_error}")
+                logger.error(f"❌ Google Calendar delete failed for {title}: {google_error}")
+            # Not connected, or a batch failed as a whole rather than per event
+            if 'error' in google_result:
+                google_sync_errors.append(f"Failed to delete events from Google Calendar: {google_result['error']}")
+                logger.error(f"❌ Google Calendar batch delete failed: {google_result['error']}")
+        
+        # Delete from local database in one statement; the response was built from
+        # the captured info above, so the session's copies needn't be reconciled.
+        # Deleting by the loaded ids, even when clearing the calendar, keeps the
+        # local delete to exactly the events just removed from Google
+        criteria = (
+            CalendarEvent.user_id == current_user.id,
+            CalendarEvent.id.in_([event.id for event in events_to_delete])
         )
+        if delete_all:
+            # Sum the freed time in the database over the same rows
+            total_freed_minutes = db.execute(
+                select(func.coalesce(func.sum(_duration_minutes(db.get_bind().dialect.name)), 0)).where(*criteria)
+            ).scalar_one()
+        deleted_count = db.execute(
+            delete(CalendarEvent).where(*criteria).execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
         
-        message = f"Successfully deleted {len(events_to_delete)} event{'s' if len(events_to_delete) != 1 else ''}"
-        if total_freed_minutes > 0:
-            hours = total_freed_minutes // 60
-            minutes = total_freed_minutes % 60
-            if hours > 0:
-                message += f" (freed up {hours}h {minutes}m)"
-            else:
-                message += f" (freed up {minutes} minutes)"
+        plural = 's' if deleted_count != 1 else ''
+        hours, minutes = divmod(total_freed_minutes, 60)
+        freed = f" (freed up {hours}h {minutes}m)" if hours else (f" (freed up {minutes} minutes)" if minutes else "")
         
         result = {
             "success": True,
-            "message": message,
-            "events_deleted": len(events_to_delete),
+            "message": f"Successfully deleted {deleted_count} event{plural}{freed}",
+            "events_deleted": deleted_count,
             "total_time_freed_minutes": total_freed_minutes,
-            "deleted_events": deleted_events_info[:5],  # Show first 5 for confirmation
+            "deleted_events": deleted_events_info,
             "google_sync_errors": google_sync_errors if google_sync_errors else None
         }
         
@@ -4,140 +4,160 @@ Analytics API Routes
 Provides data visualization endpoints for mood tracking, goal progress, and productivity insights
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import Date, case, func, desc
+import operator
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, Tuple
 
 from ..core.database import get_db
 from ..models.mood import MoodEntry
 from ..models.goal import Goal, GoalStatus
 from ..models.task import Task, TaskStatus
 from ..models.user import User
+from ..services.analytics_cache import cache_analytics, get_cached_analytics
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
-class MoodAnalyticsResponse(BaseModel):
-    """Response model for mood analytics data"""
-    daily_average: List[Dict[str, Any]]
-    weekly_trends: Dict[str, float]
-    mood_distribution: Dict[int, int]
-    energy_patterns: Dict[str, float]
-    stress_correlation: List[Dict[str, float]]
-    recommendations: List[str]
+ONE_DAY = timedelta(days=1)
 
-class ProductivityAnalyticsResponse(BaseModel):
-    """Response model for productivity analytics"""
-    task_completion_rate: float
-    daily_productivity: List[Dict[str, Any]]
-    peak_productivity_hours: List[int]
-    goal_progress_summary: List[Dict[str, Any]]
-    achievement_streaks: Dict[str, int]
+# Time-of-day periods and the index into them for each hour 0-23:
+# morning 6-12, afternoon 12-17, evening 17-22, night 22-6
+TIME_OF_DAY_PERIODS = ("morning", "afternoon", "evening", "night")
+HOUR_TO_PERIOD = bytes([3] * 6 + [0] * 6 + [1] * 5 + [2] * 5 + [3] * 2)
 
-@router.get("/mood/history/{user_id}", response_model=MoodAnalyticsResponse)
-async def get_mood_analytics(
+# Day names indexed by datetime.weekday(), so grouping by day avoids strftime("%A")
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+class MoodStats(NamedTuple):
+    """Mood figures shared by the insight helpers, computed in one pass"""
+    avg_mood: float
+    avg_energy: float
+    high_mood_count: int
+    best_entry: Any
+    worst_entry: Any
+
+@router.get("/mood/history/{user_id}")
+def get_mood_analytics(
     user_id: int,
-    days: int = 30,
+    days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db)
 ):
     """
     Get comprehensive mood analytics for visualization
     Includes daily averages, trends, patterns, and recommendations
     """
+    cached = get_cached_analytics(user_id, ('mood_history', days))
+    if cached is not None:
+        return cached
     
     # Calculate date range
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
     
-    # Fetch mood entries for the period
-    mood_entries = db.query(MoodEntry).filter(
-        MoodEntry.user_id == user_id,
-        MoodEntry.created_at >= start_date
-    ).order_by(MoodEntry.created_at).all()
-    
-    if not mood_entries:
-        return MoodAnalyticsResponse(
-            daily_average=[],
-            weekly_trends={},
-            mood_distribution={},
-            energy_patterns={},
-            stress_correlation=[],
-            recommendations=["Start tracking your mood to see insights!"]
-        )
+    # Aggregate in the database; only per-day, per-level and per-hour rows come back
+    window = (MoodEntry.user_id == user_id, MoodEntry.created_at >= start_date)
     
     # Calculate daily averages
-    daily_data = {}
-    for entry in mood_entries:
-        date_key = entry.created_at.date().isoformat()
-        if date_key not in daily_data:
-            daily_data[date_key] = {
-                'mood_sum': 0,
-                'energy_sum': 0,
-                'stress_sum': 0,
-                'count': 0
-            }
-        
-        daily_data[date_key]['mood_sum'] += entry.mood_level
-        daily_data[date_key]['energy_sum'] += entry.energy_level
-        daily_data[date_key]['stress_sum'] += entry.stress_level if entry.stress_level else 5
-        daily_data[date_key]['count'] += 1
+    day = func.date(MoodEntry.created_at, type_=Date).label('day')
+    daily_rows = db.query(
+        day,
+        func.avg(MoodEntry.mood_level),
+        func.avg(MoodEntry.energy_level),
+        func.avg(func.coalesce(MoodEntry.stress_level, 5)),
+        func.count()
+    ).filter(*window).group_by(day).order_by(day).all()
+    
+    if not daily_rows:
+        return {
+            'daily_average': [],
+            'weekly_trends': {},
+            'mood_distribution': {},
+            'energy_patterns': {},
+            'stress_correlation': [],
+            'recommendations': ["Start tracking your mood to see insights!"]
+        }
     
     # Format daily averages for chart
-    daily_average = []
-    for date, data in sorted(daily_data.items()):
-        daily_average.append({
-            'date': date,
-            'mood': round(data['mood_sum'] / data['count'], 1),
-            'energy': round(data['energy_sum'] / data['count'], 1),
-            'stress': round(data['stress_sum'] / data['count'], 1),
-            'entries': data['count']
-        })
+    daily_average = [
+        {
+            'date': entry_date.isoformat(),
+            'mood': round(float(mood_avg), 1),
+            'energy': round(float(energy_avg), 1),
+            'stress': round(float(stress_avg), 1),
+            'entries': count
+        }
+        for entry_date, mood_avg, energy_avg, stress_avg, count in daily_rows
+    ]
     
     # Calculate weekly trends
-    weekly_trends = _calculate_weekly_trends(mood_entries)
+    entry_count = sum(data['entries'] for data in daily_average)
+    weekly_trends = _calculate_weekly_trends(db, window, entry_count, end_date)
     
     # Calculate mood distribution
-    mood_distribution = {}
-    for entry in mood_entries:
-        mood_level = entry.mood_level
-        mood_distribution[mood_level] = mood_distribution.get(mood_level, 0) + 1
+    mood_distribution = {
+        mood_level: count
+        for mood_level, count in db.query(MoodEntry.mood_level, func.count())
+        .filter(*window)
+        .group_by(MoodEntry.mood_level)
+        .all()
+    }
     
     # Calculate energy patterns by time of day
-    energy_patterns = _calculate_energy_patterns(mood_entries)
+    hour = func.extract('hour', MoodEntry.created_at).label('hour')
+    hourly_energy = db.query(
+        hour, func.sum(MoodEntry.energy_level), func.count()
+    ).filter(*window).group_by(hour).all()
+    energy_patterns = _calculate_energy_patterns(hourly_energy)
     
     # Calculate stress correlation
-    stress_correlation = _calculate_stress_correlation(mood_entries)
+    recent_entries = db.query(
+        MoodEntry.mood_level,
+        MoodEntry.energy_level,
+        func.coalesce(MoodEntry.stress_level, 5).label('stress_level')
+    ).filter(*window).order_by(
+        MoodEntry.created_at.desc()
+    ).limit(10).all()
+    stress_correlation = _calculate_stress_correlation(reversed(recent_entries))
     
     # Generate insights and recommendations
     recommendations = _generate_mood_recommendations(
         daily_average, weekly_trends, energy_patterns
     )
     
-    return MoodAnalyticsResponse(
-        daily_average=daily_average,
-        weekly_trends=weekly_trends,
-        mood_distribution=mood_distribution,
-        energy_patterns=energy_patterns,
-        stress_correlation=stress_correlation,
-        recommendations=recommendations
-    )
+    return cache_analytics(user_id, ('mood_history', days), {
+        'daily_average': daily_average,
+        'weekly_trends': weekly_trends,
+        'mood_distribution': mood_distribution,
+        'energy_patterns': energy_patterns,
+        'stress_correlation': stress_correlation,
+        'recommendations': recommendations
+    })
 
 @router.get("/mood/patterns/{user_id}")
-async def get_mood_patterns(
+def get_mood_patterns(
     user_id: int,
     db: Session = Depends(get_db)
 ):
     """
     Analyze mood patterns to identify trends and triggers
     """
+    cached = get_cached_analytics(user_id, ('mood_patterns',))
+    if cached is not None:
+        return cached
     
     # Get last 60 days of mood data
     end_date = datetime.now()
     start_date = end_date - timedelta(days=60)
     
-    mood_entries = db.query(MoodEntry).filter(
+    # Plain rows of the columns the pattern helpers read, not MoodEntry instances
+    mood_entries = db.query(
+        MoodEntry.mood_level, MoodEntry.energy_level, MoodEntry.created_at
+    ).filter(
         MoodEntry.user_id == user_id,
         MoodEntry.created_at >= start_date
     ).order_by(MoodEntry.created_at).all()
@@ -145,127 +165,184 @@ async def get_mood_patterns(
     if not mood_entries:
         return {"message": "No mood data available for pattern analysis"}
     
+    # Collect everything the pattern helpers need in a single pass over the entries
+    moods = []
+    energies = []
+    day_data = [[0, 0] for _ in WEEKDAY_NAMES]  # weekday() -> [mood sum, count]
+    hour_data = defaultdict(lambda: [0, 0])  # hour -> [mood sum, count]
+    low_mood_hours = Counter()
+    low_mood_days = Counter()
+    
+    for entry in mood_entries:
+        mood_level = entry.mood_level
+        created_at = entry.created_at
+        weekday = created_at.weekday()
+        hour = created_at.hour
+        
+        moods.append(mood_level)
+        energies.append(entry.energy_level)
+        
+        day = day_data[weekday]
+        day[0] += mood_level
+        day[1] += 1
+        
+        hour_counts = hour_data[hour]
+        hour_counts[0] += mood_level
+        hour_counts[1] += 1
+        
+        if mood_level <= 4:
+            low_mood_hours[hour] += 1
+            low_mood_days[weekday] += 1
+    
     # Analyze patterns
     patterns = {
-        'day_of_week_patterns': _analyze_day_of_week_patterns(mood_entries),
-        'time_of_day_patterns': _analyze_time_of_day_patterns(mood_entries),
-        'mood_volatility': _calculate_mood_volatility(mood_entries),
-        'energy_mood_correlation': _calculate_energy_mood_correlation(mood_entries),
-        'improvement_trend': _calculate_improvement_trend(mood_entries),
-        'low_mood_triggers': _identify_low_mood_patterns(mood_entries)
+        'day_of_week_patterns': _analyze_day_of_week_patterns(day_data),
+        'time_of_day_patterns': _analyze_time_of_day_patterns(hour_data),
+        'mood_volatility': _calculate_mood_volatility(moods),
+        'energy_mood_correlation': _calculate_energy_mood_correlation(moods, energies),
+        'improvement_trend': _calculate_improvement_trend(moods),
+        'low_mood_triggers': _identify_low_mood_patterns(low_mood_hours, low_mood_days)
     }
     
-    return patterns
+    return cache_analytics(user_id, ('mood_patterns',), patterns)
 
-@router.get("/productivity/{user_id}", response_model=ProductivityAnalyticsResponse)
-async def get_productivity_analytics(
+@router.get("/productivity/{user_id}")
+def get_productivity_analytics(
     user_id: int,
-    days: int = 30,
+    days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db)
 ):
     """
     Get productivity analytics including task completion, peak hours, and goal progress
     """
+    cached = get_cached_analytics(user_id, ('productivity', days))
+    if cached is not None:
+        return cached
     
     # Calculate date range
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
     
     # Fetch tasks for the period
-    tasks = db.query(Task).filter(
+    tasks = db.query(Task).options(
+        load_only(Task.goal_id, Task.status, Task.estimated_duration, Task.created_at, Task.updated_at)
+    ).filter(
         Task.user_id == user_id,
         Task.created_at >= start_date
     ).all()
     
     # Fetch goals
-    goals = db.query(Goal).filter(Goal.user_id == user_id).all()
+    goals = db.query(Goal).options(
+        load_only(Goal.title, Goal.progress, Goal.status, Goal.target_date)
+    ).filter(Goal.user_id == user_id).all()
+    
+    # Split out completed tasks and count tasks per goal in one pass
+    completed_tasks = []
+    goal_task_counts = defaultdict(lambda: [0, 0])  # goal_id -> [tasks, completed]
+    for task in tasks:
+        counts = goal_task_counts[task.goal_id]
+        counts[0] += 1
+        if task.status == TaskStatus.COMPLETED:
+            completed_tasks.append(task)
+            counts[1] += 1
     
     # Calculate task completion rate
-    completed_tasks = [t for t in tasks if t.status == TaskStatus.COMPLETED]
     completion_rate = len(completed_tasks) / len(tasks) if tasks else 0
     
     # Calculate daily productivity
     daily_productivity = _calculate_daily_productivity(tasks, start_date, end_date)
     
     # Calculate peak productivity hours
-    peak_hours = _calculate_peak_productivity_hours(completed_tasks)
+    peak_hours = _calculate_peak_productivity_hours(db, user_id, start_date)
     
     # Calculate goal progress summary
     goal_progress = []
     for goal in goals:
-        related_tasks = [t for t in tasks if t.goal_id == goal.id]
-        completed_goal_tasks = [t for t in related_tasks if t.status == TaskStatus.COMPLETED]
+        goal_tasks, completed_goal_tasks = goal_task_counts.get(goal.id, (0, 0))
         
         goal_progress.append({
             'goal_title': goal.title,
             'goal_id': goal.id,
             'progress': goal.progress,
-            'task_completion_rate': len(completed_goal_tasks) / len(related_tasks) if related_tasks else 0,
-            'days_until_deadline': (goal.target_date - datetime.now()).days if goal.target_date else None,
+            'task_completion_rate': completed_goal_tasks / goal_tasks if goal_tasks else 0,
+            'days_until_deadline': (goal.target_date - end_date).days if goal.target_date else None,
             'status': goal.status.value
         })
     
     # Calculate achievement streaks
-    achievement_streaks = _calculate_achievement_streaks(completed_tasks)
-    
-    return ProductivityAnalyticsResponse(
-        task_completion_rate=round(completion_rate * 100, 1),
-        daily_productivity=daily_productivity,
-        peak_productivity_hours=peak_hours,
-        goal_progress_summary=goal_progress,
-        achievement_streaks=achievement_streaks
-    )
+    achievement_streaks = _calculate_achievement_streaks(completed_tasks, end_date.date())
+    
+    return cache_analytics(user_id, ('productivity', days), {
+        'task_completion_rate': round(completion_rate * 100, 1),
+        'daily_productivity': daily_productivity,
+        'peak_productivity_hours': peak_hours,
+        'goal_progress_summary': goal_progress,
+        'achievement_streaks': achievement_streaks
+    })
 
 @router.get("/insights/{user_id}")
-async def get_personalized_insights(
+def get_personalized_insights(
     user_id: int,
     db: Session = Depends(get_db)
 ):
     """
     Get AI-generated personalized insights based on mood and productivity data
     """
+    cached = get_cached_analytics(user_id, ('insights',))
+    if cached is not None:
+        return cached
     
     # Get recent data
     end_date = datetime.now()
     start_date = end_date - timedelta(days=14)
     
-    mood_entries = db.query(MoodEntry).filter(
+    mood_entries = db.query(
+        MoodEntry.mood_level, MoodEntry.energy_level, MoodEntry.created_at
+    ).filter(
         MoodEntry.user_id == user_id,
         MoodEntry.created_at >= start_date
     ).all()
     
-    tasks = db.query(Task).filter(
+    tasks = db.query(Task).options(
+        load_only(Task.status, Task.created_at, Task.updated_at)
+    ).filter(
         Task.user_id == user_id,
         Task.created_at >= start_date
     ).all()
     
+    # Summarize once; every helper below reads these instead of rescanning
+    mood_stats = _summarize_moods(mood_entries)
+    completed_tasks = [t for t in tasks if t.status == TaskStatus.COMPLETED]
+    
     # Generate insights
     insights = {
-        'mood_insights': _generate_mood_insights(mood_entries),
-        'productivity_insights': _generate_productivity_insights(tasks),
-        'recommendations': _generate_personalized_recommendations(mood_entries, tasks),
-        'celebration_moments': _identify_celebration_moments(mood_entries, tasks)
+        'mood_insights': _generate_mood_insights(mood_stats),
+        'productivity_insights': _generate_productivity_insights(tasks, completed_tasks),
+        'recommendations': _generate_personalized_recommendations(mood_stats, len(tasks) - len(completed_tasks)),
+        'celebration_moments': _identify_celebration_moments(mood_stats, len(completed_tasks))
     }
     
-    return insights
+    return cache_analytics(user_id, ('insights',), insights)
 
 # Helper functions
 
-def _calculate_weekly_trends(mood_entries: List[MoodEntry]) -> Dict[str, float]:
+def _calculate_weekly_trends(db: Session, window: Tuple, entry_count: int, now: datetime) -> Dict[str, float]:
     """Calculate week-over-week trends"""
-    if len(mood_entries) < 14:
+    if entry_count < 14:
         return {"trend": "insufficient_data"}
     
     # Split into current and previous week
-    one_week_ago = datetime.now() - timedelta(days=7)
-    current_week = [e for e in mood_entries if e.created_at >= one_week_ago]
-    previous_week = [e for e in mood_entries if e.created_at < one_week_ago]
+    one_week_ago = now - timedelta(days=7)
+    week = case((MoodEntry.created_at >= one_week_ago, 'current'), else_='previous').label('week')
+    week_averages = dict(
+        db.query(week, func.avg(MoodEntry.mood_level)).filter(*window).group_by(week).all()
+    )
     
-    if not current_week or not previous_week:
+    if 'current' not in week_averages or 'previous' not in week_averages:
         return {"trend": "insufficient_data"}
     
-    current_avg = sum(e.mood_level for e in current_week) / len(current_week)
-    previous_avg = sum(e.mood_level for e in previous_week) / len(previous_week)
+    current_avg = float(week_averages['current'])
+    previous_avg = float(week_averages['previous'])
     
     change_percent = ((current_avg - previous_avg) / previous_avg) * 100
     
@@ -276,49 +353,36 @@ def _calculate_weekly_trends(mood_entries: List[MoodEntry]) -> Dict[str, float]:
         "trend": "improving" if change_percent > 0 else "declining"
     }
 
-def _calculate_energy_patterns(mood_entries: List[MoodEntry]) -> Dict[str, float]:
-    """Calculate average energy levels by time of day"""
-    time_buckets = {
-        "morning": {"start": 6, "end": 12, "sum": 0, "count": 0},
-        "afternoon": {"start": 12, "end": 17, "sum": 0, "count": 0},
-        "evening": {"start": 17, "end": 22, "sum": 0, "count": 0},
-        "night": {"start": 22, "end": 6, "sum": 0, "count": 0}
-    }
+def _calculate_energy_patterns(hourly_energy: List[Tuple]) -> Dict[str, float]:
+    """Calculate average energy levels by time of day from (hour, energy_sum, count) rows"""
+    sums = [0] * len(TIME_OF_DAY_PERIODS)
+    counts = [0] * len(TIME_OF_DAY_PERIODS)
     
-    for entry in mood_entries:
-        hour = entry.created_at.hour
-        
-        for period, data in time_buckets.items():
-            if period == "night":
-                if hour >= data["start"] or hour < data["end"]:
-                    data["sum"] += entry.energy_level
-                    data["count"] += 1
-            else:
-                if data["start"] <= hour < data["end"]:
-                    data["sum"] += entry.energy_level
-                    data["count"] += 1
-    
-    patterns = {}
-    for period, data in time_buckets.items():
-        if data["count"] > 0:
-            patterns[period] = round(data["sum"] / data["count"], 1)
-        else:
-            patterns[period] = 0
+    for hour, energy_sum, count in hourly_energy:
+        period = HOUR_TO_PERIOD[int(hour)]
+        sums[period] += energy_sum
+        counts[period] += count
     
-    return patterns
+    return {
+        name: round(sums[period] / counts[period], 1) if counts[period] else 0
+        for period, name in enumerate(TIME_OF_DAY_PERIODS)
+    }
 
-def _calculate_stress_correlation(mood_entries: List[MoodEntry]) -> List[Dict[str, float]]:
-    """Calculate correlation between stress and mood/energy"""
-    correlations = []
+def _calculate_stress_correlation(recent_entries: Iterable[Tuple]) -> List[Dict[str, float]]:
+    """
+    Calculate correlation between stress and mood/energy
     
-    for entry in mood_entries[-10:]:  # Last 10 entries
-        correlations.append({
+    recent_entries are the last 10 entries, oldest first, already limited by
+    the query and with stress_level defaulted to 5.
+    """
+    return [
+        {
             "mood": entry.mood_level,
             "energy": entry.energy_level,
-            "stress": entry.stress_level if entry.stress_level else 5
-        })
-    
-    return correlations
+            "stress": entry.stress_level
+        }
+        for entry in recent_entries
+    ]
 
 def _generate_mood_recommendations(
     daily_average: List[Dict],
@@ -347,68 +411,44 @@ def _generate_mood_recommendations(
     
     return recommendations if recommendations else ["Keep tracking your mood to unlock personalized insights!"]
 
-def _analyze_day_of_week_patterns(mood_entries: List[MoodEntry]) -> Dict[str, float]:
-    """Analyze mood patterns by day of week"""
-    day_data = {}
-    
-    for entry in mood_entries:
-        day_name = entry.created_at.strftime("%A")
-        if day_name not in day_data:
-            day_data[day_name] = {"sum": 0, "count": 0}
-        
-        day_data[day_name]["sum"] += entry.mood_level
-        day_data[day_name]["count"] += 1
-    
-    patterns = {}
-    for day, data in day_data.items():
-        patterns[day] = round(data["sum"] / data["count"], 1) if data["count"] > 0 else 0
-    
-    return patterns
+def _analyze_day_of_week_patterns(day_data: List[List[int]]) -> Dict[str, float]:
+    """Analyze mood patterns by day of week from [mood sum, count] per weekday() index"""
+    return {
+        WEEKDAY_NAMES[weekday]: round(mood_sum / count, 1)
+        for weekday, (mood_sum, count) in enumerate(day_data)
+        if count
+    }
 
-def _analyze_time_of_day_patterns(mood_entries: List[MoodEntry]) -> Dict[int, float]:
-    """Analyze mood patterns by hour of day"""
-    hour_data = {}
-    
-    for entry in mood_entries:
-        hour = entry.created_at.hour
-        if hour not in hour_data:
-            hour_data[hour] = {"sum": 0, "count": 0}
-        
-        hour_data[hour]["sum"] += entry.mood_level
-        hour_data[hour]["count"] += 1
-    
-    patterns = {}
-    for hour in range(24):
-        if hour in hour_data and hour_data[hour]["count"] > 0:
-            patterns[hour] = round(hour_data[hour]["sum"] / hour_data[hour]["count"], 1)
-    
-    return patterns
+def _analyze_time_of_day_patterns(hour_data: Dict[int, List[int]]) -> Dict[int, float]:
+    """Analyze mood patterns by hour of day from [mood sum, count] per hour"""
+    return {
+        hour: round(mood_sum / count, 1)
+        for hour, (mood_sum, count) in sorted(hour_data.items())
+    }
 
-def _calculate_mood_volatility(mood_entries: List[MoodEntry]) -> float:
+def _calculate_mood_volatility(moods: List[int]) -> float:
     """Calculate mood volatility (standard deviation)"""
-    if len(mood_entries) < 2:
+    if len(moods) < 2:
         return 0
     
-    moods = [e.mood_level for e in mood_entries]
-    mean = sum(moods) / len(moods)
-    variance = sum((x - mean) ** 2 for x in moods) / len(moods)
+    n = len(moods)
+    mean = sum(moods) / n
+    # Integer sum of squares in one C-level pass; variance = E[x^2] - E[x]^2
+    variance = max(sum(map(operator.mul, moods, moods)) / n - mean * mean, 0)
     return round(variance ** 0.5, 2)
 
-def _calculate_energy_mood_correlation(mood_entries: List[MoodEntry]) -> float:
+def _calculate_energy_mood_correlation(moods: List[int], energies: List[int]) -> float:
     """Calculate correlation between energy and mood"""
-    if len(mood_entries) < 2:
+    if len(moods) < 2:
         return 0
     
-    moods = [e.mood_level for e in mood_entries]
-    energies = [e.energy_level for e in mood_entries]
-    
-    # Simple correlation coefficient
+    # Simple correlation coefficient; the levels are ints, so every sum is exact
     n = len(moods)
     sum_x = sum(moods)
     sum_y = sum(energies)
-    sum_xy = sum(x * y for x, y in zip(moods, energies))
-    sum_x2 = sum(x ** 2 for x in moods)
-    sum_y2 = sum(y ** 2 for y in energies)
+    sum_xy = sum(map(operator.mul, moods, energies))
+    sum_x2 = sum(map(operator.mul, moods, moods))
+    sum_y2 = sum(map(operator.mul, energies, energies))
     
     numerator = n * sum_xy - sum_x * sum_y
     denominator = ((n * sum_x2 - sum_x ** 2) * (n * sum_y2 - sum_y ** 2)) ** 0.5
@@ -418,17 +458,14 @@ def _calculate_energy_mood_correlation(mood_entries: List[MoodEntry]) -> float:
     
     return round(numerator / denominator, 2)
 
-def _calculate_improvement_trend(mood_entries: List[MoodEntry]) -> Dict[str, Any]:
+def _calculate_improvement_trend(moods: List[int]) -> Dict[str, Any]:
     """Calculate overall improvement trend"""
-    if len(mood_entries) < 7:
+    if len(moods) < 7:
         return {"trend": "insufficient_data"}
     
     # Compare first and last week averages
-    first_week = mood_entries[:7]
-    last_week = mood_entries[-7:]
-    
-    first_avg = sum(e.mood_level for e in first_week) / 7
-    last_avg = sum(e.mood_level for e in last_week) / 7
+    first_avg = sum(moods[:7]) / 7
+    last_avg = sum(moods[-7:]) / 7
     
     improvement = last_avg - first_avg
     
@@ -439,117 +476,95 @@ def _calculate_improvement_trend(mood_entries: List[MoodEntry]) -> Dict[str, Any
         "trend": "improving" if improvement > 0.5 else "stable" if improvement > -0.5 else "declining"
     }
 
-def _identify_low_mood_patterns(mood_entries: List[MoodEntry]) -> List[str]:
-    """Identify patterns when mood is low"""
-    low_mood_entries = [e for e in mood_entries if e.mood_level <= 4]
-    
-    if not low_mood_entries:
+def _identify_low_mood_patterns(low_mood_hours: Counter, low_mood_days: Counter) -> List[str]:
+    """Identify patterns when mood is low from counts of low-mood entries per hour and weekday()"""
+    if not low_mood_hours:
         return ["No low mood patterns detected"]
     
     patterns = []
     
     # Check time patterns
-    low_mood_hours = [e.created_at.hour for e in low_mood_entries]
-    if low_mood_hours:
-        most_common_hour = max(set(low_mood_hours), key=low_mood_hours.count)
-        patterns.append(f"Low moods often occur around {most_common_hour}:00")
+    most_common_hour = low_mood_hours.most_common(1)[0][0]
+    patterns.append(f"Low moods often occur around {most_common_hour}:00")
     
     # Check day patterns
-    low_mood_days = [e.created_at.strftime("%A") for e in low_mood_entries]
-    if low_mood_days:
-        most_common_day = max(set(low_mood_days), key=low_mood_days.count)
-        patterns.append(f"Low moods are more common on {most_common_day}s")
+    most_common_day = WEEKDAY_NAMES[low_mood_days.most_common(1)[0][0]]
+    patterns.append(f"Low moods are more common on {most_common_day}s")
     
     return patterns
 
 def _calculate_daily_productivity(tasks: List[Task], start_date: datetime, end_date: datetime) -> List[Dict]:
     """Calculate daily productivity metrics"""
-    daily_data = {}
-    
-    # Initialize all days in range
-    current = start_date.date()
-    while current <= end_date.date():
-        daily_data[current.isoformat()] = {
-            "created": 0,
-            "completed": 0,
-            "total_duration": 0
-        }
-        current += timedelta(days=1)
+    # Initialize all days in range, in date order, keyed by ordinal day number:
+    # [created, completed, total duration]
+    daily_data = {
+        ordinal: [0, 0, 0]
+        for ordinal in range(start_date.toordinal(), end_date.toordinal() + 1)
+    }
     
     # Aggregate task data
     for task in tasks:
-        date_key = task.created_at.date().isoformat()
-        if date_key in daily_data:
-            daily_data[date_key]["created"] += 1
+        day = daily_data.get(task.created_at.toordinal())
+        if day is not None:
+            day[0] += 1
             
             if task.status == TaskStatus.COMPLETED:
-                daily_data[date_key]["completed"] += 1
+                day[1] += 1
                 if task.estimated_duration:
-                    daily_data[date_key]["total_duration"] += task.estimated_duration
+                    day[2] += task.estimated_duration
     
     # Format for response
     return [
         {
-            "date": date,
-            "tasks_created": data["created"],
-            "tasks_completed": data["completed"],
-            "completion_rate": round(data["completed"] / data["created"] * 100, 1) if data["created"] > 0 else 0,
-            "total_minutes": data["total_duration"]
+            "date": date.fromordinal(ordinal).isoformat(),
+            "tasks_created": created,
+            "tasks_completed": completed,
+            "completion_rate": round(completed / created * 100, 1) if created > 0 else 0,
+            "total_minutes": total_duration
         }
-        for date, data in sorted(daily_data.items())
+        for ordinal, (created, completed, total_duration) in daily_data.items()
     ]
 
-def _calculate_peak_productivity_hours(completed_tasks: List[Task]) -> List[int]:
-    """Identify hours when most tasks are completed"""
-    hour_counts = {}
-    
-    for task in completed_tasks:
-        if task.updated_at:
-            hour = task.updated_at.hour
-            hour_counts[hour] = hour_counts.get(hour, 0) + 1
-    
-    if not hour_counts:
-        return []
+def _calculate_peak_productivity_hours(db: Session, user_id: int, start_date: datetime) -> List[int]:
+    """Identify hours when most tasks are completed, counted in the database"""
+    hour = func.extract('hour', Task.updated_at).label('hour')
+    completions = func.count().label('completions')
     
     # Get top 3 hours
-    sorted_hours = sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)
-    return [hour for hour, count in sorted_hours[:3]]
+    rows = db.query(hour, completions).filter(
+        Task.user_id == user_id,
+        Task.created_at >= start_date,
+        Task.status == TaskStatus.COMPLETED,
+        Task.updated_at.isnot(None)
+    ).group_by(hour).order_by(completions.desc()).limit(3).all()
+    
+    return [int(row.hour) for row in rows]
 
-def _calculate_achievement_streaks(completed_tasks: List[Task]) -> Dict[str, int]:
+def _calculate_achievement_streaks(completed_tasks: List[Task], today: date) -> Dict[str, int]:
     """Calculate streaks of task completion"""
     if not completed_tasks:
         return {"current_streak": 0, "longest_streak": 0}
     
-    # Sort tasks by completion date
-    sorted_tasks = sorted(completed_tasks, key=lambda x: x.updated_at or x.created_at)
+    # Streaks only depend on which days had a completion, so walk unique days
+    completion_days = sorted({(task.updated_at or task.created_at).date() for task in completed_tasks})
     
     current_streak = 0
     longest_streak = 0
     last_date = None
     
-    for task in sorted_tasks:
-        task_date = (task.updated_at or task.created_at).date()
-        
-        if last_date is None:
-            current_streak = 1
-        elif task_date == last_date:
-            # Same day, don't increment
-            pass
-        elif task_date == last_date + timedelta(days=1):
+    for task_date in completion_days:
+        if last_date is not None and task_date - last_date == ONE_DAY:
             # Consecutive day
             current_streak += 1
         else:
-            # Streak broken
-            longest_streak = max(longest_streak, current_streak)
+            # First day or streak broken
             current_streak = 1
         
+        longest_streak = max(longest_streak, current_streak)
         last_date = task_date
     
-    longest_streak = max(longest_streak, current_streak)
-    
     # Check if streak is still active
-    today = datetime.now().date()
-    if last_date != today and last_date != today - timedelta(days=1):
+    if last_date != today and last_date != today - ONE_DAY:
         current_streak = 0
     
     return {
@@ -557,27 +572,56 @@ def _calculate_achievement_streaks(completed_tasks: List[Task]) -> Dict[str, int
         "longest_streak": longest_streak
     }
 
-def _generate_mood_insights(mood_entries: List[MoodEntry]) -> List[str]:
-    """Generate insights from mood data"""
+def _summarize_moods(mood_entries: List[Tuple]) -> Optional[MoodStats]:
+    """Compute the mood figures the insight helpers share in one pass, or None without entries"""
     if not mood_entries:
+        return None
+    
+    mood_sum = 0
+    energy_sum = 0
+    high_mood_count = 0
+    best_entry = worst_entry = mood_entries[0]
+    
+    for entry in mood_entries:
+        mood_level = entry.mood_level
+        mood_sum += mood_level
+        energy_sum += entry.energy_level
+        if mood_level >= 8:
+            high_mood_count += 1
+        if mood_level > best_entry.mood_level:
+            best_entry = entry
+        elif mood_level < worst_entry.mood_level:
+            worst_entry = entry
+    
+    count = len(mood_entries)
+    return MoodStats(
+        avg_mood=mood_sum / count,
+        avg_energy=energy_sum / count,
+        high_mood_count=high_mood_count,
+        best_entry=best_entry,
+        worst_entry=worst_entry
+    )
+
+def _generate_mood_insights(mood_stats: Optional[MoodStats]) -> List[str]:
+    """Generate insights from mood data"""
+    if mood_stats is None:
         return ["Start tracking your mood to see insights"]
     
     insights = []
     
     # Average mood
-    avg_mood = sum(e.mood_level for e in mood_entries) / len(mood_entries)
-    insights.append(f"Your average mood over the past 2 weeks: {avg_mood:.1f}/10")
+    insights.append(f"Your average mood over the past 2 weeks: {mood_stats.avg_mood:.1f}/10")
     
     # Best and worst days
-    best_day = max(mood_entries, key=lambda x: x.mood_level)
-    worst_day = min(mood_entries, key=lambda x: x.mood_level)
+    best_day = mood_stats.best_entry
+    worst_day = mood_stats.worst_entry
     
-    insights.append(f"Your best day was {best_day.created_at.strftime('%A')} with a mood of {best_day.mood_level}/10")
-    insights.append(f"Your most challenging day was {worst_day.created_at.strftime('%A')} with a mood of {worst_day.mood_level}/10")
+    insights.append(f"Your best day was {WEEKDAY_NAMES[best_day.created_at.weekday()]} with a mood of {best_day.mood_level}/10")
+    insights.append(f"Your most challenging day was {WEEKDAY_NAMES[worst_day.created_at.weekday()]} with a mood of {worst_day.mood_level}/10")
     
     return insights
 
-def _generate_productivity_insights(tasks: List[Task]) -> List[str]:
+def _generate_productivity_insights(tasks: List[Task], completed: List[Task]) -> List[str]:
     """Generate insights from task data"""
     if not tasks:
         return ["Create some tasks to see productivity insights"]
@@ -585,14 +629,13 @@ def _generate_productivity_insights(tasks: List[Task]) -> List[str]:
     insights = []
     
     # Completion rate
-    completed = [t for t in tasks if t.status == TaskStatus.COMPLETED]
     completion_rate = len(completed) / len(tasks) * 100
     insights.append(f"You've completed {completion_rate:.0f}% of your tasks")
     
     # Most productive day
     day_counts = {}
     for task in completed:
-        day = task.updated_at.strftime("%A") if task.updated_at else task.created_at.strftime("%A")
+        day = WEEKDAY_NAMES[(task.updated_at or task.created_at).weekday()]
         day_counts[day] = day_counts.get(day, 0) + 1
     
     if day_counts:
@@ -602,44 +645,37 @@ def _generate_productivity_insights(tasks: List[Task]) -> List[str]:
     return insights
 
 def _generate_personalized_recommendations(
-    mood_entries: List[MoodEntry],
-    tasks: List[Task]
+    mood_stats: Optional[MoodStats],
+    incomplete_count: int
 ) -> List[str]:
     """Generate personalized recommendations"""
     recommendations = []
     
-    if mood_entries:
-        avg_mood = sum(e.mood_level for e in mood_entries) / len(mood_entries)
-        avg_energy = sum(e.energy_level for e in mood_entries) / len(mood_entries)
-        
-        if avg_mood < 5:
+    if mood_stats is not None:
+        if mood_stats.avg_mood < 5:
             recommendations.append("Consider scheduling more activities that bring you joy")
         
-        if avg_energy < 5:
+        if mood_stats.avg_energy < 5:
             recommendations.append("Low energy detected - prioritize rest and recovery")
     
-    if tasks:
-        incomplete = [t for t in tasks if t.status != TaskStatus.COMPLETED]
-        if len(incomplete) > 10:
-            recommendations.append("You have many incomplete tasks - consider prioritizing or delegating")
+    if incomplete_count > 10:
+        recommendations.append("You have many incomplete tasks - consider prioritizing or delegating")
     
     return recommendations if recommendations else ["You're doing great! Keep it up!"]
 
 def _identify_celebration_moments(
-    mood_entries: List[MoodEntry],
-    tasks: List[Task]
+    mood_stats: Optional[MoodStats],
+    completed_count: int
 ) -> List[str]:
     """Identify moments worth celebrating"""
     celebrations = []
     
     # High mood days
-    high_mood_days = [e for e in mood_entries if e.mood_level >= 8]
-    if high_mood_days:
-        celebrations.append(f"You had {len(high_mood_days)} great mood days!")
+    if mood_stats is not None and mood_stats.high_mood_count:
+        celebrations.append(f"You had {mood_stats.high_mood_count} great mood days!")
     
     # Task completions
-    completed = [t for t in tasks if t.status == TaskStatus.COMPLETED]
-    if len(completed) >= 10:
-        celebrations.append(f"Amazing! You completed {len(completed)} tasks!")
+    if completed_count >= 10:
+        celebrations.append(f"Amazing! You completed {completed_count} tasks!")
     
-    return celebrations if celebrations else ["Keep going - celebrations are coming!"]
\ No newline at end of file
+    return celebrations if celebrations else ["Keep going - celebrations are coming!"]
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from pydantic import BaseModel, EmailStr, field_validator, ValidationInfo
-from app.core.database import get_db
+from app.core.database import get_db, no_expire_on_commit
 from app.core.security import (
-    verify_password, get_password_hash, decode_access_token, 
+    verify_and_update_password, get_password_hash, decode_access_token, 
     validate_password, create_token_pair, decode_refresh_token
 )
 from app.core.validation import (
@@ -16,6 +17,7 @@ from app.core.error_handlers import ValidationAPIError, AuthenticationError, Con
 from app.models import User
 from app.core.config import settings
 from app.middleware.rate_limit import rate_limiter
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +25,15 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
 
+# Registration errors for the users unique constraints. psycopg2 reports the
+# violated index name; SQLite's message names the column
+_DUPLICATE_USER_ERRORS = {
+    "ix_users_username": "Username already registered",
+    "UNIQUE constraint failed: users.username": "Username already registered",
+    "ix_users_email": "Email already registered",
+    "UNIQUE constraint failed: users.email": "Email already registered",
+}
+
 class RegisterRequest(BaseModel):
     username: str
     email: EmailStr
@@ -146,8 +157,14 @@ async def login(
         (User.username == identifier) | (User.email == identifier)
     ).first()
     
-    # Verify credentials
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Verify credentials; hashing is CPU-bound, so it runs off the event loop
+    password_valid, new_hash = False, None
+    if user:
+        password_valid, new_hash = await asyncio.to_thread(
+            verify_and_update_password, form_data.password, user.hashed_password
+        )
+    
+    if not password_valid:
         # Record failed attempt
         rate_limiter.record_failed_login(client_id)
         logger.warning(f"Failed login attempt for identifier: {identifier} from {client_id}")
@@ -165,6 +182,11 @@ async def login(
             detail="Account is disabled",
         )
     
+    # Rehash legacy bcrypt passwords with argon2id while the plain password is at hand
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    
     # Create token pair
     tokens = create_token_pair({"sub": user.username, "user_id": user.id})
     
@@ -190,26 +212,10 @@ async def register(
             detail="Too many registration attempts. Please try again later.",
         )
     
-    # Check if user already exists (case-insensitive)
-    existing_user = db.query(User).filter(
-        (User.username == user_data.username.lower()) | (User.email == user_data.email)
-    ).first()
-    
-    if existing_user:
-        if existing_user.username == user_data.username.lower():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Username already registered"
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already registered"
-            )
-    
-    # Create new user
+    # Create new user. The unique indexes on username and email reject duplicates,
+    # so there is no separate existence check to race against
     try:
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
         db_user = User(
             username=user_data.username.lower(),
             email=user_data.email,
@@ -217,9 +223,10 @@ async def register(
             is_active=True
         )
         
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        # The id comes back from the INSERT, so nothing needs reloading after commit
+        with no_expire_on_commit(db):
+            db.add(db_user)
+            db.commit()
         
         logger.info(f"New user registered: {db_user.username}")
         
@@ -230,6 +237,22 @@ async def register(
             is_active=db_user.is_active
         )
     
+    except IntegrityError as e:
+        db.rollback()
+        diag = getattr(e.orig, 'diag', None)
+        violated = getattr(diag, 'constraint_name', None) or str(e.orig)
+        detail = _DUPLICATE_USER_ERRORS.get(violated)
+        if detail is None:
+            logger.error(f"Error creating user: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create user account"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+    
     except Exception as e:
         db.rollback()
         logger.error(f"Error creating user: {e}")
@@ -10,7 +10,7 @@ import os
 from app.core.database import get_db
 from app.core.config import settings
 from app.models import CalendarEvent, User
-from app.services.google_calendar_service import GoogleCalendarService
+from app.services.google_calendar_service import GoogleCalendarService, build_calendar_service
 from app.routers.auth import get_current_user
 
 router = APIRouter()
@@ -415,10 +415,9 @@ async def delete_calendar_event(
     if event.google_event_id and google_calendar_service.is_calendar_connected(current_user.id):
         try:
             # Delete from Google Calendar
-            from googleapiclient.discovery import build
             credentials = google_calendar_service.get_user_credentials(current_user.id)
             if credentials:
-                service = build('calendar', 'v3', credentials=credentials)
+                service = build_calendar_service(credentials)
                 service.events().delete(
                     calendarId='primary',
                     eventId=event.google_event_id
@@ -465,10 +464,9 @@ async def update_calendar_event(
     # Update in Google Calendar if it's synced
     if event.google_event_id and google_calendar_service.is_calendar_connected(current_user.id):
         try:
-            from googleapiclient.discovery import build
             credentials = google_calendar_service.get_user_credentials(current_user.id)
             if credentials:
-                service = build('calendar', 'v3', credentials=credentials)
+                service = build_calendar_service(credentials)
                 
                 # Format event for Google Calendar API
                 google_event = {
@@ -637,6 +635,8 @@ async def disconnect_google_calendar(
                 files_removed.append(file_path)
                 print(f"🗑️ Removed token file: {file_path}")
         
+        google_calendar_service.invalidate_connection_status(user_id)
+        
         # Update database
         current_user.google_calendar_connected = False
         db.commit()
@@ -772,10 +772,9 @@ async def get_calendar_diagnostics(
         
         # Test 5: Google API test
         try:
-            from googleapiclient.discovery import build
             credentials = google_calendar_service.get_user_credentials(current_user.id)
             if credentials:
-                service = build('calendar', 'v3', credentials=credentials)
+                service = build_calendar_service(credentials)
                 calendar_list = service.calendarList().list(maxResults=1).execute()
                 diagnostics["tests"]["google_api"] = {
                     "status": "pass",
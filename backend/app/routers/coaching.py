@@ -12,6 +12,7 @@ from typing import List, Optional, Dict, Any
 from ..core.database import get_db
 from ..services.goal_coaching_service import GoalCoachingService
 from ..services.intelligent_coaching_service import IntelligentCoachingService
+from ..services.analytics_cache import invalidate_analytics_cache
 from ..models.chat import ChatMessage, MessageRole, MessageType
 
 router = APIRouter()
@@ -160,6 +161,7 @@ async def create_tasks_from_coaching(
             created_tasks.append(task)
         
         db.commit()
+        invalidate_analytics_cache(request.user_id)
         
         return {
             'message': f'Successfully created {len(created_tasks)} tasks',
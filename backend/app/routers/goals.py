@@ -7,6 +7,8 @@ from datetime import datetime, date
 from app.core.database import get_db
 from app.models import Goal, GoalStatus, GoalCategory, User
 from app.services.openai_service import OpenAIService
+from app.services.ai_calendar_service import AICalendarService
+from app.services.analytics_cache import invalidate_analytics_cache
 from app.routers.auth import get_current_user
 
 router = APIRouter()
@@ -97,6 +99,8 @@ async def create_goal(
     db.add(goal)
     db.commit()
     db.refresh(goal)
+    AICalendarService.invalidate_user_context(current_user.id)
+    invalidate_analytics_cache(current_user.id)
     
     # Add calculated fields
     if goal.target_date:
@@ -149,6 +153,8 @@ async def update_goal(
     
     db.commit()
     db.refresh(goal)
+    AICalendarService.invalidate_user_context(current_user.id)
+    invalidate_analytics_cache(current_user.id)
     
     # Add calculated fields
     if goal.target_date:
@@ -174,6 +180,8 @@ async def delete_goal(
     
     db.delete(goal)
     db.commit()
+    AICalendarService.invalidate_user_context(current_user.id)
+    invalidate_analytics_cache(current_user.id)
     
     return {"message": "Goal deleted successfully"}
 
@@ -205,6 +213,7 @@ async def update_progress(
     
     db.commit()
     db.refresh(goal)
+    invalidate_analytics_cache(current_user.id)
     
     return {"message": "Progress updated", "progress": progress, "status": goal.status}
 
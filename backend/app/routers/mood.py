@@ -9,6 +9,7 @@ from app.core.database import get_db
 from app.models import MoodEntry, User
 from app.services.openai_service import OpenAIService
 from app.routers.auth import get_current_user
+from app.services.analytics_cache import invalidate_analytics_cache
 
 router = APIRouter()
 openai_service = OpenAIService()
@@ -120,6 +121,7 @@ async def mood_checkin(
             }
     
     db.commit()
+    invalidate_analytics_cache(current_user.id)
     
     return {
         "status": "success",
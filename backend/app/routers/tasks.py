@@ -15,6 +15,7 @@ from ..models.goal import Goal, GoalStatus
 from ..models.user import User
 from ..services.task_management_service import TaskManagementService
 from .auth import get_current_user
+from ..services.analytics_cache import invalidate_analytics_cache
 from pydantic import BaseModel, Field
 
 router = APIRouter()
@@ -182,6 +183,7 @@ async def create_task(
     
     db.add(task)
     db.commit()
+    invalidate_analytics_cache(current_user.id)
     db.refresh(task)
     
     # Return response
@@ -287,6 +289,7 @@ async def update_task(
             )
     
     db.commit()
+    invalidate_analytics_cache(current_user.id)
     db.refresh(task)
     
     # Update goal progress in background if task is completed
@@ -341,6 +344,7 @@ async def delete_task(
     
     db.delete(task)
     db.commit()
+    invalidate_analytics_cache(current_user.id)
     
     return {"message": "Task deleted successfully"}
 
@@ -474,6 +478,7 @@ async def start_task(
     
     task.start_task()
     db.commit()
+    invalidate_analytics_cache(current_user.id)
     
     return {
         "message": "Task started successfully",
@@ -512,6 +517,7 @@ async def complete_task(
     
     task.complete_task(completion_notes, actual_duration)
     db.commit()
+    invalidate_analytics_cache(current_user.id)
     
     # Update goal progress in background
     if task.goal_id:
@@ -6,28 +6,65 @@ Provides intelligent calendar management with AI-powered scheduling,
 goal-based time allocation, and hour-by-hour planning for solopreneurs.
 """
 
+import copy
 import json
+import time as time_module
+from collections import OrderedDict
 from datetime import datetime, timedelta, time
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+import orjson
+import redis
+from pydantic import BaseModel, ConfigDict, ValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
 from .openai_service import OpenAIService
+from .google_calendar_service import GoogleCalendarService
 from .autonomous_scheduling_service import AutonomousSchedulingService
+from ..core.redis_client import get_redis_client
 from ..models.user import User
-from ..models.calendar import CalendarEvent, EventType, EventPriority, SchedulingType
+from ..models.calendar import CalendarEvent, EventType, EventPriority, SchedulingType, EisenhowerQuadrant
 from ..models.goal import Goal, GoalStatus
 from ..models.task import Task, TaskStatus, TaskPriority
 
 
+class EisenhowerClassification(BaseModel):
+    """
+    One event's classification as returned by the batch classification prompt
+    """
+    model_config = ConfigDict(extra='allow')
+    
+    index: Optional[int] = None
+    quadrant: EisenhowerQuadrant
+    is_urgent: bool = False
+    is_important: bool = True
+    urgency_reason: Optional[str] = None
+    importance_reason: Optional[str] = None
+    confidence: float = 0.7
+
+
 class AICalendarService:
     """
     AI-powered calendar service for intelligent event management
     """
     
+    # Seconds a user's classification context is reused. It lives in Redis so a
+    # goal write's invalidation reaches every worker; without Redis each process
+    # keeps its own, bounded, with the oldest entries dropped first
+    USER_CONTEXT_TTL = 60
+    USER_CONTEXT_CACHE_MAX_ENTRIES = 1024
+    _user_context_cache: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
+    # Dependency analyses are reused for an hour while the event and the
+    # calendar it was compared against are unchanged; least recently used go first
+    DEPENDENCY_CACHE_TTL = 3600
+    DEPENDENCY_CACHE_MAX_ENTRIES = 512
+    _dependency_cache: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    
     def __init__(self):
         self.openai_service = OpenAIService()
         self.scheduling_service = AutonomousSchedulingService()
+        self.google_service = GoogleCalendarService()
         
     async def create_smart_event(
         self,
@@ -141,11 +178,8 @@ class AICalendarService:
         google_synced = False
         google_event_url = None
         try:
-            from app.services.google_calendar_service import GoogleCalendarService
-            google_service = GoogleCalendarService()
-            
-            if google_service.is_calendar_connected(user_id):
-                google_result = google_service.create_calendar_event(
+            if self.google_service.is_calendar_connected(user_id):
+                google_result = self.google_service.create_calendar_event(
                     user_id,
                     {
                         'title': title,
@@ -179,21 +213,37 @@ class AICalendarService:
             'google_event_url': google_event_url
         }
     
+    def _resolve_event(
+        self,
+        event_id: Union[int, CalendarEvent],
+        user_id: int,
+        db: Session
+    ) -> Optional[CalendarEvent]:
+        """
+        Return the user's event, reusing an already-loaded instance when given one
+        """
+        if isinstance(event_id, CalendarEvent):
+            return event_id if event_id.user_id == user_id else None
+        
+        return db.query(CalendarEvent).filter(
+            CalendarEvent.id == event_id,
+            CalendarEvent.user_id == user_id
+        ).first()
+    
     async def update_event_intelligently(
         self,
-        event_id: int,
+        event_id: Union[int, CalendarEvent],
         user_id: int,
         updates: Dict[str, Any],
         db: Session
     ) -> Dict[str, Any]:
         """
         Update a calendar event with AI optimization
+
+        event_id may be the event's id or an already-loaded CalendarEvent.
         """
         
-        event = db.query(CalendarEvent).filter(
-            CalendarEvent.id == event_id,
-            CalendarEvent.user_id == user_id
-        ).first()
+        event = self._resolve_event(event_id, user_id, db)
         
         if not event:
             return {'success': False, 'error': 'Event not found'}
@@ -241,18 +291,17 @@ class AICalendarService:
     
     async def delete_event_and_reschedule(
         self,
-        event_id: int,
+        event_id: Union[int, CalendarEvent],
         user_id: int,
         db: Session
     ) -> Dict[str, Any]:
         """
         Delete an event and intelligently reschedule affected tasks
+
+        event_id may be the event's id or an already-loaded CalendarEvent.
         """
         
-        event = db.query(CalendarEvent).filter(
-            CalendarEvent.id == event_id,
-            CalendarEvent.user_id == user_id
-        ).first()
+        event = self._resolve_event(event_id, user_id, db)
         
         if not event:
             return {'success': False, 'error': 'Event not found'}
@@ -446,10 +495,14 @@ class AICalendarService:
         event_data: Dict[str, Any],
         ai_analysis: Dict[str, Any],
         db: Session,
-        eisenhower_classification: Dict[str, Any] = None
+        eisenhower_classification: Dict[str, Any] = None,
+        pending_events: Optional[List[Dict[str, Any]]] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Find the optimal time slot for an event using Eisenhower Matrix priorities
+
+        pending_events are events planned in the current request but not yet
+        written to the database; they are treated as busy time.
         """
         
         # Use autonomous scheduling service to find best slot
@@ -502,6 +555,8 @@ class AICalendarService:
         
         # Get available slots for next 14 days
         calendar_events = self.scheduling_service._get_calendar_events(user_id, 14, db)
+        if pending_events:
+            calendar_events.extend(pending_events)
         preferences = self.scheduling_service._get_user_preferences(user_id, db)
         energy_patterns = self.scheduling_service._analyze_energy_patterns(user_id, db)
         
@@ -857,10 +912,9 @@ class AICalendarService:
         Use AI to classify an event into the Eisenhower Matrix quadrants
         """
         try:
-            from openai import OpenAI
-            import os
-            
-            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            client = self.openai_service.client
+            if client is None:
+                raise RuntimeError("OpenAI client is not configured")
             
             classification_prompt = f"""
 You are an expert productivity consultant. Analyze this task/event and classify it using the Eisenhower Matrix.
@@ -907,7 +961,6 @@ Return JSON:
                 temperature=0.3
             )
             
-            import json
             classification = json.loads(response.choices[0].message.content)
             
             return {
@@ -919,6 +972,99 @@ Return JSON:
             # Fallback classification based on keywords
             return self._fallback_eisenhower_classification(event_title, event_description, goal_related)
     
+    async def classify_eisenhower_matrix_batch(
+        self,
+        events: List[Dict[str, Any]],
+        user_context: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify several events into Eisenhower Matrix quadrants with one AI call
+        
+        Each event is a dict with title, description and goal_related. Results are
+        aligned with the input and shaped like classify_eisenhower_matrix's result;
+        events the AI skips or garbles get the keyword fallback.
+        """
+        if not events:
+            return []
+        
+        classifications: List[Optional[Dict[str, Any]]] = [None] * len(events)
+        
+        try:
+            client = self.openai_service.client
+            if client is None:
+                raise RuntimeError("OpenAI client is not configured")
+            
+            event_list = "\n".join(
+                f"{index}. Title: \"{event['title']}\" | Description: \"{event.get('description') or 'No description'}\" | Is Goal-Related: {event.get('goal_related', False)}"
+                for index, event in enumerate(events)
+            )
+            
+            classification_prompt = f"""
+You are an expert productivity consultant. Analyze each task/event below and classify it using the Eisenhower Matrix.
+
+EISENHOWER MATRIX QUADRANTS:
+1. Q1 (Urgent + Important): Crisis, emergencies, deadlines TODAY/TOMORROW, critical problems
+2. Q2 (Not Urgent + Important): Goal work, planning, skill development, relationship building, prevention
+3. Q3 (Urgent + Not Important): Interruptions, some emails, non-essential meetings, busy work with deadlines
+4. Q4 (Not Urgent + Not Important): Time wasters, excessive social media, trivial activities, mindless browsing
+
+USER CONTEXT:
+- Goals: {user_context.get('goals', 'Not specified')}
+- Work Focus: {user_context.get('work_focus', 'General productivity')}
+- Current Priorities: {user_context.get('priorities', 'Not specified')}
+
+EVENTS TO CLASSIFY:
+{event_list}
+
+CLASSIFICATION RULES:
+- Urgent = Has a deadline within 2-3 days OR is time-sensitive
+- Important = Contributes to goals, values, or long-term success
+
+Return a JSON array with one object per event, in the same order:
+[
+  {{
+    "index": 0,
+    "quadrant": "q1_urgent_important|q2_not_urgent_important|q3_urgent_not_important|q4_not_urgent_not_important",
+    "is_urgent": true/false,
+    "is_important": true/false,
+    "urgency_reason": "Why this is urgent (deadline, dependency, etc.) or null",
+    "importance_reason": "Why this is important (goal contribution, impact, etc.) or null",
+    "confidence": 0.95,
+    "scheduling_recommendation": "do_first|schedule|delegate|eliminate",
+    "optimal_time_allocation": "How much time should be spent on this type of task"
+  }}
+]
+"""
+            
+            response = client.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": classification_prompt},
+                    {"role": "user", "content": f"Classify these {len(events)} events"}
+                ],
+                temperature=0.3
+            )
+            
+            for position, item in enumerate(json.loads(response.choices[0].message.content)):
+                try:
+                    classification = EisenhowerClassification.model_validate(item)
+                except ValidationError:
+                    continue
+                index = position if classification.index is None else classification.index
+                if 0 <= index < len(events):
+                    classifications[index] = classification.model_dump(mode='json')
+                    
+        except Exception as e:
+            print(f"⚠️ Batch Eisenhower classification failed, using keyword fallback: {e}")
+        
+        return [
+            {'success': True, 'classification': classification} if classification else
+            self._fallback_eisenhower_classification(
+                event['title'], event.get('description', ''), event.get('goal_related', False)
+            )
+            for event, classification in zip(events, classifications)
+        ]
+    
     def _fallback_eisenhower_classification(
         self,
         event_title: str,
@@ -971,14 +1117,63 @@ Return JSON:
             }
         }
     
+    @classmethod
+    def invalidate_user_context(cls, user_id: int):
+        """
+        Forget the cached classification context for a user, e.g. after their goals change
+        """
+        client = get_redis_client()
+        if client is not None:
+            try:
+                client.delete(f"user_context:{user_id}")
+            except redis.RedisError as e:
+                print(f"Error invalidating user context: {e}")
+            return
+        cls._user_context_cache.pop(user_id, None)
+    
     async def _get_user_context(self, user_id: int, db: Session) -> Dict[str, Any]:
+        """
+        Get user context for Eisenhower Matrix classification, reusing recent results
+        """
+        client = get_redis_client()
+        if client is not None:
+            try:
+                cached = client.get(f"user_context:{user_id}")
+            except redis.RedisError as e:
+                print(f"Error reading cached user context: {e}")
+                cached = None
+            if cached:
+                return orjson.loads(cached)
+            
+            user_context = await self._load_user_context(user_id, db)
+            try:
+                client.set(f"user_context:{user_id}", orjson.dumps(user_context), ex=self.USER_CONTEXT_TTL)
+            except redis.RedisError as e:
+                print(f"Error caching user context: {e}")
+            return user_context
+        
+        now = time_module.monotonic()
+        cached = self._user_context_cache.get(user_id)
+        if cached and now - cached[0] < self.USER_CONTEXT_TTL:
+            return cached[1]
+        
+        user_context = await self._load_user_context(user_id, db)
+        self._user_context_cache.pop(user_id, None)
+        self._user_context_cache[user_id] = (now, user_context)
+        # Entries are in write order, so the expired and the excess are all at the front
+        while self._user_context_cache:
+            stored_at = next(iter(self._user_context_cache.values()))[0]
+            if (len(self._user_context_cache) <= self.USER_CONTEXT_CACHE_MAX_ENTRIES
+                    and now - stored_at < self.USER_CONTEXT_TTL):
+                break
+            self._user_context_cache.popitem(last=False)
+        return user_context
+    
+    async def _load_user_context(self, user_id: int, db: Session) -> Dict[str, Any]:
         """
         Get user context for Eisenhower Matrix classification
         """
         try:
-            from app.models import User
-            from app.models.goal import Goal
-            
             user = db.query(User).filter(User.id == user_id).first()
             if not user:
                 return {}
@@ -1012,8 +1207,6 @@ Return JSON:
         When an event moves, automatically reschedule dependent events
         """
         try:
-            from app.models.calendar import CalendarEvent
-            
             # Get the moved event
             moved_event = db.query(CalendarEvent).filter(
                 CalendarEvent.id == moved_event_id,
@@ -1153,8 +1346,6 @@ Return JSON:
         """
         Find a conflict-free time slot for an event
         """
-        from app.models.calendar import CalendarEvent
-        
         current_time = preferred_start
         search_end = preferred_start + timedelta(days=max_search_days)
         
@@ -1180,73 +1371,98 @@ Return JSON:
         
         return None
     
+    _DEPENDENCY_INSTRUCTIONS = """
+Analyze the new event in the user's message and identify potential dependencies with the existing events listed below.
+
+DEPENDENCY TYPES:
+1. SEQUENTIAL: Event B must happen after Event A completes
+2. SAME_DAY: Events should happen on the same day
+3. BEFORE_DEADLINE: Event must happen before a deadline event
+4. PREPARATION: Event A is preparation for Event B
+
+Return JSON:
+{
+  "dependencies_found": true/false,
+  "dependent_events": [
+    {
+      "event_title": "Existing event title",
+      "dependency_type": "sequential|same_day|before_deadline|preparation",
+      "relationship": "This new event depends on existing event OR existing event depends on this new event",
+      "reason": "Why these events are related",
+      "confidence": 0.9
+    }
+  ],
+  "suggestions": [
+    "Scheduling suggestions based on dependencies"
+  ]
+}
+"""
+    
     async def detect_event_dependencies(
         self,
         event_title: str,
         event_description: str,
-        existing_events: List,
+        existing_events: Sequence[Any],
         user_id: int
     ) -> Dict[str, Any]:
         """
         Use AI to detect potential dependencies between events
+
+        existing_events only needs id, title and start_time attributes, so
+        column-projected rows work as well as CalendarEvent instances.
         """
+        # Limit to recent events, listed by id so the prompt prefix stays stable
+        # between requests and the provider's prompt cache can reuse it
+        existing_events = sorted(existing_events[:20], key=lambda event: event.id)
+        
+        # Keyed per user on the normalized new event and exactly what the prompt lists
+        cache_key = (
+            user_id,
+            " ".join(event_title.lower().split()),
+            " ".join((event_description or "").lower().split()),
+            tuple((event.id, event.title, event.start_time) for event in existing_events)
+        )
+        now = time_module.monotonic()
+        cached = self._dependency_cache.get(cache_key)
+        if cached and now - cached[0] < self.DEPENDENCY_CACHE_TTL:
+            self._dependency_cache.move_to_end(cache_key)
+            return {'success': True, 'analysis': copy.deepcopy(cached[1])}
+        
         try:
-            from openai import OpenAI
-            import os
-            
-            client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            client = self.openai_service.client
+            if client is None:
+                raise RuntimeError("OpenAI client is not configured")
             
             # Create event list for analysis
             event_list = "\n".join([
                 f"- {event.title} ({event.start_time.strftime('%Y-%m-%d %H:%M')})" 
-                for event in existing_events[:20]  # Limit to recent events
+                for event in existing_events
             ])
             
-            dependency_prompt = f"""
-Analyze this new event and identify potential dependencies with existing events.
-
+            new_event = f"""
 NEW EVENT:
 - Title: "{event_title}"
 - Description: "{event_description or 'No description'}"
 
-EXISTING EVENTS:
-{event_list}
-
-DEPENDENCY TYPES:
-1. SEQUENTIAL: Event B must happen after Event A completes
-2. SAME_DAY: Events should happen on the same day
-3. BEFORE_DEADLINE: Event must happen before a deadline event
-4. PREPARATION: Event A is preparation for Event B
-
-Return JSON:
-{{
-  "dependencies_found": true/false,
-  "dependent_events": [
-    {{
-      "event_title": "Existing event title",
-      "dependency_type": "sequential|same_day|before_deadline|preparation",
-      "relationship": "This new event depends on existing event OR existing event depends on this new event",
-      "reason": "Why these events are related",
-      "confidence": 0.9
-    }}
-  ],
-  "suggestions": [
-    "Scheduling suggestions based on dependencies"
-  ]
-}}
+Analyze dependencies for: {event_title}
 """
             
+            # Fixed instructions, then the user's calendar, then the new event last
             response = client.chat.completions.create(
                 model="gpt-4",
                 messages=[
-                    {"role": "system", "content": dependency_prompt},
-                    {"role": "user", "content": f"Analyze dependencies for: {event_title}"}
+                    {"role": "system", "content": f"{self._DEPENDENCY_INSTRUCTIONS}\nEXISTING EVENTS:\n{event_list}"},
+                    {"role": "user", "content": new_event}
                 ],
                 temperature=0.3
             )
             
-            import json
-            analysis = json.loads(response.choices[0].message.content)
+            analysis = orjson.loads(response.choices[0].message.content)
+            
+            self._dependency_cache[cache_key] = (now, copy.deepcopy(analysis))
+            self._dependency_cache.move_to_end(cache_key)
+            if len(self._dependency_cache) > self.DEPENDENCY_CACHE_MAX_ENTRIES:
+                self._dependency_cache.popitem(last=False)
             
             return {
                 'success': True,
@@ -0,0 +1,105 @@
+"""
+Analytics Response Cache
+Per-user TTL cache for the analytics endpoints, shared with the write paths that invalidate it
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Tuple
+
+import orjson
+import redis
+from fastapi.encoders import jsonable_encoder
+
+from ..core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds an analytics response is reused. Mood, task and goal writes drop the
+# writer's entries early, so the TTL only bounds staleness from other changes
+ANALYTICS_CACHE_TTL = 300
+
+# Responses live in Redis, one hash per user, so an invalidation reaches every
+# worker. Without Redis each process keeps a bounded cache of its own, where
+# invalidation only reaches the worker that handled the write
+ANALYTICS_CACHE_MAX_ENTRIES = 1024
+_analytics_cache: "OrderedDict[Tuple[int, Tuple], Tuple[float, Any]]" = OrderedDict()
+_analytics_cache_lock = threading.Lock()
+
+
+def _redis_key(user_id: int) -> str:
+    return f"analytics:{user_id}"
+
+
+def _redis_field(key: Tuple) -> str:
+    return ":".join(map(str, key))
+
+
+def get_cached_analytics(user_id: int, key: Tuple) -> Any:
+    """Return a cached analytics response for user_id, or None if missing or expired"""
+    client = get_redis_client()
+    if client is not None:
+        try:
+            cached = client.hget(_redis_key(user_id), _redis_field(key))
+        except redis.RedisError as e:
+            logger.warning(f"Analytics cache read failed: {e}")
+            return None
+        if cached:
+            # The hash's expiry follows its latest write, so each field carries its own time
+            stored_at, response = orjson.loads(cached)
+            if time.time() - stored_at < ANALYTICS_CACHE_TTL:
+                return response
+        return None
+
+    with _analytics_cache_lock:
+        cached = _analytics_cache.get((user_id, key))
+    if cached and time.monotonic() - cached[0] < ANALYTICS_CACHE_TTL:
+        return cached[1]
+    return None
+
+
+def cache_analytics(user_id: int, key: Tuple, response: Any) -> Any:
+    """Remember an analytics response for user_id and return it"""
+    client = get_redis_client()
+    if client is not None:
+        try:
+            pipe = client.pipeline()
+            # Stored as the JSON the endpoint serves, so hits return the same body
+            pipe.hset(
+                _redis_key(user_id), _redis_field(key),
+                orjson.dumps([time.time(), jsonable_encoder(response)], option=orjson.OPT_NON_STR_KEYS)
+            )
+            pipe.expire(_redis_key(user_id), ANALYTICS_CACHE_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Analytics cache write failed: {e}")
+        return response
+
+    now = time.monotonic()
+    with _analytics_cache_lock:
+        _analytics_cache.pop((user_id, key), None)
+        _analytics_cache[(user_id, key)] = (now, response)
+        # Entries are in write order, so the expired and the excess are all at the front
+        while _analytics_cache:
+            stored_at = next(iter(_analytics_cache.values()))[0]
+            if len(_analytics_cache) <= ANALYTICS_CACHE_MAX_ENTRIES and now - stored_at < ANALYTICS_CACHE_TTL:
+                break
+            _analytics_cache.popitem(last=False)
+    return response
+
+
+def invalidate_analytics_cache(user_id: int) -> None:
+    """Forget cached analytics for a user after their moods, tasks or goals change"""
+    client = get_redis_client()
+    if client is not None:
+        try:
+            client.delete(_redis_key(user_id))
+        except redis.RedisError as e:
+            logger.error(f"Analytics cache invalidation failed for user {user_id}: {e}")
+        return
+
+    with _analytics_cache_lock:
+        for cache_key in [cache_key for cache_key in _analytics_cache if cache_key[0] == user_id]:
+            del _analytics_cache[cache_key]
@@ -1,20 +1,33 @@
 import os
 import json
+import shutil
+import time
 import requests
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.database import get_db
 from app.models.user import User
 from app.models.calendar import CalendarEvent, EventType
 from app.services.meeting_extractor import MeetingLinkExtractor
 
+# Calendar v3 discovery document shipped with google-api-python-client, parsed
+# once so building a per-request service needs neither HTTP nor JSON parsing
+_CALENDAR_DISCOVERY_DOC = json.loads(get_static_doc('calendar', 'v3'))
+
+
+def build_calendar_service(credentials: Credentials):
+    """Build a Calendar v3 client for credentials from the cached discovery document"""
+    return build_from_document(_CALENDAR_DISCOVERY_DOC, credentials=credentials)
+
 
 class GoogleCalendarService:
     SCOPES = [
@@ -22,6 +35,13 @@ class GoogleCalendarService:
         'https://www.googleapis.com/auth/calendar.events'
     ]
     
+    # Maximum number of calls sent in one batched HTTP request
+    BATCH_SIZE = 50
+    
+    # Seconds a connection check result is reused, shared by all instances
+    CONNECTION_CACHE_TTL = 60
+    _connection_cache: Dict[int, Tuple[float, bool]] = {}
+    
     def __init__(self):
         self.credentials_file = os.getenv('GOOGLE_CREDENTIALS_FILE', 'credentials.json')
         self.token_dir = 'tokens'
@@ -89,9 +109,6 @@ class GoogleCalendarService:
             # Fetch token directly without state validation
             try:
                 # Create token exchange request manually
-                from google.auth.transport.requests import Request
-                import requests
-                
                 # Load client secrets
                 with open(self.credentials_file, 'r') as f:
                     client_config = json.load(f)
@@ -140,9 +157,11 @@ class GoogleCalendarService:
                 token.write(credentials.to_json())
             
             # Test the connection by fetching calendar info
-            service = build('calendar', 'v3', credentials=credentials)
+            service = build_calendar_service(credentials)
             calendar_list = service.calendarList().list().execute()
             
+            self.invalidate_connection_status(user_id)
+            
             return {
                 'success': True,
                 'user_id': user_id,
@@ -156,8 +175,12 @@ class GoogleCalendarService:
                 'error': str(e)
             }
     
-    def get_user_credentials(self, user_id: int) -> Optional[Credentials]:
-        """Get stored credentials with ULTRA-ROBUST refresh handling - NEVER DISCONNECT"""
+    def get_user_credentials(self, user_id: int, verify_connection: bool = True) -> Optional[Credentials]:
+        """Get stored credentials with ULTRA-ROBUST refresh handling - NEVER DISCONNECT
+        
+        verify_connection=False skips the calendarList probe for callers whose own
+        API calls will surface a broken connection anyway.
+        """
         token_file = os.path.join(self.token_dir, f'token_{user_id}.json')
         backup_token_file = os.path.join(self.token_dir, f'token_{user_id}_backup.json')
         
@@ -180,7 +203,6 @@ class GoogleCalendarService:
                     print(f"🚨 Token expired for user {user_id}")
                 elif credentials.expiry:
                     # Refresh if less than 10 minutes remaining (instead of waiting for expiry)
-                    from datetime import datetime, timezone, timedelta
                     now = datetime.now(timezone.utc)
                     
                     # Handle timezone-aware/naive datetime comparison
@@ -201,7 +223,6 @@ class GoogleCalendarService:
                     try:
                         # Create backup before refresh
                         if os.path.exists(token_file):
-                            import shutil
                             shutil.copy2(token_file, backup_token_file)
                             print(f"📋 Created token backup for user {user_id}")
                         
@@ -214,7 +235,6 @@ class GoogleCalendarService:
                                 print(f"🔄 Refresh attempt {retry + 1} failed: {retry_error}")
                                 if retry == 2:  # Last attempt
                                     raise retry_error
-                                import time
                                 time.sleep(1)  # Wait before retry
                         
                         # Save refreshed credentials to BOTH files
@@ -240,10 +260,9 @@ class GoogleCalendarService:
                         return None
                 
                 # FINAL VALIDATION: Test actual API connectivity
-                if credentials and credentials.valid:
+                if verify_connection and credentials and credentials.valid:
                     try:
-                        from googleapiclient.discovery import build
-                        service = build('calendar', 'v3', credentials=credentials)
+                        service = build_calendar_service(credentials)
                         # Quick API test
                         service.calendarList().list(maxResults=1).execute()
                         print(f"✅ ULTRA-ROBUST: API connectivity confirmed for user {user_id}")
@@ -267,9 +286,6 @@ class GoogleCalendarService:
         """FORCE update database connection status with retries"""
         for attempt in range(3):
             try:
-                from app.core.database import get_db
-                from app.models.user import User
-                
                 db = next(get_db())
                 user = db.query(User).filter(User.id == user_id).first()
                 if user:
@@ -283,15 +299,12 @@ class GoogleCalendarService:
             except Exception as e:
                 print(f"❌ Database update attempt {attempt + 1} failed: {e}")
                 if attempt < 2:
-                    import time
                     time.sleep(0.5)
     
     def _mark_user_disconnected(self, user_id: int):
         """Mark user as disconnected from Google Calendar in database"""
+        self._connection_cache[user_id] = (time.monotonic(), False)
         try:
-            from app.core.database import get_db
-            from app.models.user import User
-            
             db = next(get_db())
             user = db.query(User).filter(User.id == user_id).first()
             if user:
@@ -301,7 +314,23 @@ class GoogleCalendarService:
         except Exception as e:
             print(f"⚠️ Could not update database status for user {user_id}: {e}")
     
-    def is_calendar_connected(self, user_id: int) -> bool:
+    def invalidate_connection_status(self, user_id: int):
+        """Forget the cached connection check for a user"""
+        self._connection_cache.pop(user_id, None)
+    
+    def is_calendar_connected(self, user_id: int, use_cache: bool = True) -> bool:
+        """Check if user has connected their Google Calendar, reusing recent results"""
+        now = time.monotonic()
+        if use_cache:
+            cached = self._connection_cache.get(user_id)
+            if cached and now - cached[0] < self.CONNECTION_CACHE_TTL:
+                return cached[1]
+        
+        connected = self._check_calendar_connection(user_id)
+        self._connection_cache[user_id] = (now, connected)
+        return connected
+    
+    def _check_calendar_connection(self, user_id: int) -> bool:
         """Check if user has connected their Google Calendar with robust validation"""
         try:
             credentials = self.get_user_credentials(user_id)
@@ -311,7 +340,7 @@ class GoogleCalendarService:
             # Additional validation: try a simple API call to confirm working connection
             if credentials.valid:
                 try:
-                    service = build('calendar', 'v3', credentials=credentials)
+                    service = build_calendar_service(credentials)
                     # Simple test call to verify the connection works
                     calendar_list = service.calendarList().list(maxResults=1).execute()
                     print(f"✅ Google Calendar API test successful for user {user_id}")
@@ -335,7 +364,7 @@ class GoogleCalendarService:
             return {'success': False, 'error': 'Calendar not connected'}
         
         try:
-            service = build('calendar', 'v3', credentials=credentials)
+            service = build_calendar_service(credentials)
             
             # Get events from now to days_ahead in the future
             now = datetime.utcnow()
@@ -443,30 +472,12 @@ class GoogleCalendarService:
             return {'success': False, 'error': 'Calendar not connected'}
         
         try:
-            service = build('calendar', 'v3', credentials=credentials)
-            
-            # Format event for Google Calendar API
-            google_event = {
-                'summary': event_data.get('title', 'Aurora Event'),
-                'description': event_data.get('description', ''),
-                'start': {
-                    'dateTime': event_data['start_time'].isoformat(),
-                    'timeZone': 'UTC',
-                },
-                'end': {
-                    'dateTime': event_data['end_time'].isoformat(),
-                    'timeZone': 'UTC',
-                },
-            }
-            
-            # Add location if provided
-            if event_data.get('location'):
-                google_event['location'] = event_data['location']
+            service = build_calendar_service(credentials)
             
             # Create event in Google Calendar
             created_event = service.events().insert(
                 calendarId='primary',
-                body=google_event
+                body=self._to_google_event(event_data)
             ).execute()
             
             return {
@@ -481,6 +492,112 @@ class GoogleCalendarService:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def batch_create_calendar_events(self, user_id: int, events_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create several events in Google Calendar using batched HTTP requests
+        
+        Returns one result per input event, in the same order and shaped like
+        create_calendar_event's result.
+        """
+        # One credential load and one client for the whole batch
+        credentials = self.get_user_credentials(user_id, verify_connection=False)
+        if not credentials:
+            return [{'success': False, 'error': 'Calendar not connected'} for _ in events_data]
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(events_data)
+        
+        def _on_response(request_id, response, exception):
+            index = int(request_id)
+            if exception is None:
+                results[index] = {
+                    'success': True,
+                    'event_id': response['id'],
+                    'event_url': response.get('htmlLink'),
+                    'message': 'Event created in Google Calendar'
+                }
+            else:
+                results[index] = {'success': False, 'error': f'Google API error: {exception}'}
+        
+        try:
+            service = build_calendar_service(credentials)
+            
+            for i in range(0, len(events_data), self.BATCH_SIZE):
+                batch = service.new_batch_http_request(callback=_on_response)
+                for index in range(i, min(i + self.BATCH_SIZE, len(events_data))):
+                    batch.add(
+                        service.events().insert(calendarId='primary', body=self._to_google_event(events_data[index])),
+                        request_id=str(index)
+                    )
+                batch.execute()
+                
+        except Exception as e:
+            error = f'Google API error: {e}' if isinstance(e, HttpError) else str(e)
+            return [result or {'success': False, 'error': error} for result in results]
+        
+        return results
+    
+    def batch_delete_events(self, user_id: int, google_event_ids: List[str]) -> Dict[str, Any]:
+        """Delete several events from Google Calendar using batched HTTP requests"""
+        # One credential load and one client for the whole batch
+        credentials = self.get_user_credentials(user_id, verify_connection=False)
+        if not credentials:
+            return {'success': False, 'error': 'Calendar not connected', 'deleted': [], 'errors': {}}
+        
+        deleted = []
+        errors = {}
+        
+        def _on_response(request_id, response, exception):
+            # 404/410 mean the event is already gone from Google, which is what we want
+            if exception is None or (
+                isinstance(exception, HttpError) and exception.resp.status in (404, 410)
+            ):
+                deleted.append(request_id)
+            else:
+                errors[request_id] = str(exception)
+        
+        # Event ids double as batch request ids, which must be unique
+        google_event_ids = list(dict.fromkeys(google_event_ids))
+        
+        try:
+            service = build_calendar_service(credentials)
+            
+            # Google accepts up to 1000 calls per batch but recommends keeping batches small
+            for i in range(0, len(google_event_ids), self.BATCH_SIZE):
+                batch = service.new_batch_http_request(callback=_on_response)
+                for google_event_id in google_event_ids[i:i + self.BATCH_SIZE]:
+                    batch.add(
+                        service.events().delete(calendarId='primary', eventId=google_event_id),
+                        request_id=google_event_id
+                    )
+                batch.execute()
+            
+            return {'success': not errors, 'deleted': deleted, 'errors': errors}
+            
+        except HttpError as error:
+            return {'success': False, 'error': f'Google API error: {error}', 'deleted': deleted, 'errors': errors}
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'deleted': deleted, 'errors': errors}
+    
+    def _to_google_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format an Aurora event for the Google Calendar API"""
+        google_event = {
+            'summary': event_data.get('title', 'Aurora Event'),
+            'description': event_data.get('description', ''),
+            'start': {
+                'dateTime': event_data['start_time'].isoformat(),
+                'timeZone': 'UTC',
+            },
+            'end': {
+                'dateTime': event_data['end_time'].isoformat(),
+                'timeZone': 'UTC',
+            },
+        }
+        
+        # Add location if provided
+        if event_data.get('location'):
+            google_event['location'] = event_data['location']
+        
+        return google_event
+    
     def get_calendar_insights(self, user_id: int, db: Session) -> Dict[str, Any]:
         """Get AI insights about user's calendar patterns"""
         try:
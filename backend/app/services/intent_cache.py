@@ -0,0 +1,64 @@
+import copy
+import math
+import operator
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+
+class IntentCache:
+    """Semantic-similarity cache in front of the calendar assistant's intent classifier"""
+
+    # Intents whose downstream handling only depends on the intent itself, not on
+    # request-specific extracted_info (target times, keywords, durations)
+    CACHEABLE_INTENTS = {"CREATE_TASKS", "VIEW_SCHEDULE", "OPTIMIZE_SCHEDULE"}
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        max_entries_per_user: int = 50,
+        embedding_model: str = "text-embedding-3-small"
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_user = max_entries_per_user
+        self.embedding_model = embedding_model
+        self._entries: Dict[int, Deque[Tuple[List[float], Dict[str, Any]]]] = {}
+
+    async def embed(self, client: AsyncOpenAI, text: str) -> Optional[List[float]]:
+        """Return a unit-length embedding for text, or None if the embedding call fails"""
+        try:
+            response = await client.embeddings.create(model=self.embedding_model, input=text)
+        except Exception as e:
+            print(f"⚠️ Intent cache embedding failed: {e}")
+            return None
+
+        vector = response.data[0].embedding
+        norm = math.sqrt(sum(x * x for x in vector))
+        if not norm:
+            return None
+        return [x / norm for x in vector]
+
+    def lookup(self, user_id: int, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the closest cached intent analysis above the similarity threshold"""
+        best_score = self.similarity_threshold
+        best_match = None
+
+        for cached_embedding, intent_analysis in self._entries.get(user_id, ()):
+            # Both vectors are unit length, so the dot product is the cosine similarity
+            score = sum(map(operator.mul, embedding, cached_embedding))
+            if score >= best_score:
+                best_score = score
+                best_match = intent_analysis
+
+        return copy.deepcopy(best_match) if best_match is not None else None
+
+    def store(self, user_id: int, embedding: List[float], intent_analysis: Dict[str, Any]) -> None:
+        """Remember an intent analysis if its intent is safe to reuse"""
+        if intent_analysis.get('intent') not in self.CACHEABLE_INTENTS:
+            return
+
+        entries = self._entries.get(user_id)
+        if entries is None:
+            entries = self._entries[user_id] = deque(maxlen=self.max_entries_per_user)
+        entries.append((embedding, copy.deepcopy(intent_analysis)))
@@ -0,0 +1,83 @@
+import re
+from typing import Any, Dict, Optional
+
+
+# Whole-request patterns for phrasings that map to exactly one assistant intent.
+# Anything that doesn't match one of these in full goes to the LLM classifier.
+_FILLER = r"(?:please\s+|can you\s+|could you\s+|i want to\s+|i'd like to\s+)?"
+
+# Only generic nouns: "all meetings" or "every task you created" names a subset,
+# and BULK_DELETE with ['all'] would clear the whole calendar, so those go to the LLM
+_BULK_DELETE = re.compile(
+    _FILLER +
+    r"(?:delete|remove|clear|cancel|wipe)(?:\s+out)?\s+"
+    r"(?:all|every|everything)(?:\s+(?:of\s+)?(?:my|the))?"
+    r"(?:\s+(?:events?|items?|things?))?"
+    r"(?:\s+(?:in|on|from)\s+my\s+calendar)?"
+    r"|" + _FILLER + r"clear\s+(?:my|the)\s+(?:calendar|schedule)"
+)
+
+_BULK_MODIFY_DURATION = re.compile(
+    _FILLER +
+    r"(?:make|set|change|adjust|shorten|cut|trim)\s+"
+    r"(?:all|each|every)(?:\s+(?:of\s+)?(?:my|the))?\s+"
+    r"(?:events?|tasks?|meetings?|sessions?|blocks?)\s+"
+    r"(?:to\s+|down\s+to\s+)?(?:only\s+)?"
+    r"(?P<amount>\d+)\s*(?P<unit>minutes?|mins?|m|hours?|hrs?|h)(?:\s+(?:long|each))?"
+)
+
+_VIEW_SCHEDULE = re.compile(
+    _FILLER +
+    r"(?:(?:what'?s|what\s+is|show(?:\s+me)?|how'?s|how\s+is|how\s+does)\s+"
+    r"(?:on\s+)?my\s+(?:schedule|calendar|agenda|day|week)"
+    r"(?:\s+look(?:ing)?)?(?:\s+like)?"
+    r"|what\s+do\s+i\s+have(?:\s+(?:on|planned|scheduled))?)"
+    r"(?:\s+(?:for\s+)?(?:today|tomorrow|this\s+week|next\s+week))?"
+)
+
+_OPTIMIZE_SCHEDULE = re.compile(
+    _FILLER +
+    r"(?:optimi[sz]e|reorgani[sz]e|rearrange|improve)\s+"
+    r"my\s+(?:day|schedule|calendar|week)"
+)
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s.!?]+$")
+
+
+def _result(intent: str, reasoning: str, **extracted_info: Any) -> Dict[str, Any]:
+    """Build a classification shaped like the LLM classifier's JSON"""
+    extracted_info.setdefault('target_event_keywords', [])
+    extracted_info['reasoning'] = reasoning
+    return {
+        "intent": intent,
+        "confidence": 0.95,
+        "extracted_info": extracted_info
+    }
+
+
+def match_intent(user_request: str) -> Optional[Dict[str, Any]]:
+    """
+    Classify unambiguous assistant requests locally.
+
+    Returns the same dict shape as the LLM intent classifier, or None when the
+    request needs the LLM.
+    """
+    text = _TRAILING_PUNCTUATION.sub("", user_request.strip().lower())
+
+    if _BULK_DELETE.fullmatch(text):
+        return _result("BULK_DELETE", "Request clears the whole calendar", target_event_keywords=['all'])
+
+    match = _BULK_MODIFY_DURATION.fullmatch(text)
+    if match:
+        amount = int(match.group('amount'))
+        if match.group('unit').startswith('h'):
+            amount *= 60
+        return _result("BULK_MODIFY_DURATION", "Request sets one duration for every event", duration_minutes=amount)
+
+    if _VIEW_SCHEDULE.fullmatch(text):
+        return _result("VIEW_SCHEDULE", "Request asks to see the schedule")
+
+    if _OPTIMIZE_SCHEDULE.fullmatch(text):
+        return _result("OPTIMIZE_SCHEDULE", "Request asks to optimize the schedule")
+
+    return None
@@ -14,6 +14,7 @@ from ..models.user import User
 from ..models.goal import Goal, GoalStatus
 from ..models.task import Task, TaskStatus, TaskPriority, TaskType, TaskDependency
 from ..models.mood import MoodEntry
+from .analytics_cache import invalidate_analytics_cache
 from .openai_service import OpenAIService
 
 
@@ -98,6 +99,7 @@ class TaskManagementService:
             created_tasks.append(task)
         
         db.commit()
+        invalidate_analytics_cache(user_id)
         return created_tasks
     
     async def suggest_next_task(
@@ -181,11 +183,15 @@ class TaskManagementService:
             new_progress = (completed_weight / total_weight) * 100
             goal.progress = round(new_progress, 1)
             db.commit()
+            # Runs as a background task after the request already cleared the
+            # cache, so analytics read in between would keep the old progress
+            invalidate_analytics_cache(goal.user_id)
             
             # Check for milestone celebration
             if new_progress >= 100 and goal.status != GoalStatus.COMPLETED:
                 goal.status = GoalStatus.COMPLETED
                 db.commit()
+                invalidate_analytics_cache(goal.user_id)
                 return {"milestone": "goal_completed", "progress": new_progress}
             elif new_progress >= 75 and goal.progress < 75:
                 return {"milestone": "75_percent", "progress": new_progress}
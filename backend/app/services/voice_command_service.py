@@ -14,6 +14,8 @@ from ..models.goal import Goal, GoalStatus, GoalCategory
 from ..models.task import Task, TaskStatus, TaskPriority, TaskType
 from ..models.mood import MoodEntry
 from ..models.calendar import CalendarEvent
+from .ai_calendar_service import AICalendarService
+from .analytics_cache import invalidate_analytics_cache
 from .openai_service import OpenAIService
 
 
@@ -216,6 +218,7 @@ If the command is conversational or unclear, use action "chat_response" and incl
         
         db.add(mood_entry)
         db.commit()
+        invalidate_analytics_cache(user_id)
         
         return {
             'success': True,
@@ -244,6 +247,8 @@ If the command is conversational or unclear, use action "chat_response" and incl
         
         db.add(goal)
         db.commit()
+        AICalendarService.invalidate_user_context(user_id)
+        invalidate_analytics_cache(user_id)
         
         return {
             'success': True,
@@ -272,6 +277,7 @@ If the command is conversational or unclear, use action "chat_response" and incl
         
         db.add(task)
         db.commit()
+        invalidate_analytics_cache(user_id)
         
         return {
             'success': True,
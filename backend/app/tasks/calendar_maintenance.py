@@ -101,7 +101,7 @@ class CalendarMaintenance:
             
             for user in connected_users:
                 try:
-                    is_healthy = self.google_service.is_calendar_connected(user.id)
+                    is_healthy = self.google_service.is_calendar_connected(user.id, use_cache=False)
                     if not is_healthy:
                         logger.warning(f"🚨 User {user.id} calendar connection unhealthy")
                         user.google_calendar_connected = False